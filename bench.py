@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+from engine import step_grid
+from active_region import ActiveRegionStepper
+from parallel import BandedStepper
+from bitboard import BitBoardStepper
+from simulator import Simulator, RULE_PRESETS, AGE_RULE_PRESETS
+from palettes import COLOR_PALETTES, DEFAULT_DEAD_COLOR, palette_colors, flicker_dead_color
+
+# Benchmarks of the hot paths, saved as JSON and compared against a baseline:
+#   update_grid            - every preset, plain and age influence, 64x48 up to 600x600
+#   stepper                - the steppers against engine.step_grid, Conway's rule: active
+#                            regions on a dense seed (whole-grid fallback) and a sparse one,
+#                            banded parallel stepping on every CPU (at every size), bitboards
+#   draw_grid              - GridRenderer.draw on an offscreen surface (needs pygame)
+#   initialize_grid_with_text - with a cold and a warm glyph cache (needs PIL)
+#   update_color_array     - palette_colors and flicker_dead_color at high age resolutions
+# Every case is sampled REPEATS times, the median is the result. update_grid
+# samples step GENERATIONS generations from the same random seed, so cycle
+# detection and active regions work like in a real run. Example:
+#   python bench.py --output before.json
+#   python bench.py --output after.json --baseline before.json
+
+SIZES = [(64, 48), (160, 120), (320, 240), (600, 600)]
+GENERATIONS = 20      # Generations per update_grid sample
+REPEATS = 5
+SEED_DENSITY = 0.3
+COLOR_BITS = (12, 16)  # Age resolutions of the update_color_array cases
+THRESHOLD = 1.1       # Ratio to the baseline that counts as slower (or, inverted, faster)
+GRID_COLOR = (50, 50, 50)         # Same as gol.py
+BACKGROUND_COLOR = (30, 30, 40)   # Same as gol.py
+
+def measure(run, setup=None, repeats=REPEATS, per=1):
+    """Median and minimum seconds per call of run() over repeats samples, setup() runs untimed before each"""
+    samples = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) / per)
+    return {"seconds": statistics.median(samples), "min": min(samples), "repeats": repeats}
+
+def update_grid_cases(sizes, age_influence):
+    presets = AGE_RULE_PRESETS if age_influence else RULE_PRESETS
+    mode = "age" if age_influence else "plain"
+    for w, h in sizes:
+        seed = (np.random.default_rng(0).random((h, w)) < SEED_DENSITY).astype(np.uint8)
+        for preset in range(len(presets)):
+            sim = Simulator(w, h, 4, age_influence)
+            sim.apply_preset(preset)
+
+            def setup(sim=sim):
+                sim.grid = seed.astype(sim.grid.dtype)
+                sim.generation = 0
+
+            def run(sim=sim):
+                for _ in range(GENERATIONS):
+                    sim.update_grid()
+
+            yield f"update_grid/{mode}/{w}x{h}/preset{preset}", run, setup, GENERATIONS
+
+def stepper_cases(sizes):
+    birth, survive = RULE_PRESETS[0]
+    for w, h in sizes:
+        dense = (np.random.default_rng(0).random((h, w)) < SEED_DENSITY).astype(np.uint8)
+        # One small random patch, every other tile stays quiet
+        sparse = np.zeros_like(dense)
+        sparse[:min(h, 16), :min(w, 16)] = dense[:min(h, 16), :min(w, 16)]
+
+        def run_step_grid(seed=dense):
+            grid = seed
+            for _ in range(GENERATIONS):
+                grid = step_grid(grid, birth, survive, 15)
+
+        yield f"stepper/step_grid/{w}x{h}", run_step_grid, None, GENERATIONS
+
+        for name, seed in (("dense", dense), ("sparse", sparse)):
+            stepper = ActiveRegionStepper()
+
+            def run(stepper=stepper, seed=seed):
+                grid = seed
+                for _ in range(GENERATIONS):
+                    grid = stepper.step(grid, birth, survive, 15)
+
+            yield f"stepper/active_region/{name}/{w}x{h}", run, stepper.reset, GENERATIONS
+
+        # The worker pool starts on the first step and stops once the case is done
+        banded = BandedStepper(os.cpu_count(), min_cells=0)
+
+        def run_banded(stepper=banded, seed=dense):
+            grid = seed
+            for _ in range(GENERATIONS):
+                grid = stepper.step(grid, birth, survive, 15)
+
+        yield f"stepper/parallel/{w}x{h}", run_banded, None, GENERATIONS
+        banded.close()
+
+        bitboard = BitBoardStepper()
+
+        def run_bitboard(stepper=bitboard, seed=dense):
+            grid = seed
+            for _ in range(GENERATIONS):
+                grid = stepper.step(grid, birth, survive, 15)
+            # Ages are unpacked once, like Simulator.run() reading the grid at the end
+            stepper.materialize()
+
+        yield f"stepper/bitboard/{w}x{h}", run_bitboard, bitboard.reset, GENERATIONS
+
+def draw_grid_cases(sizes):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+        from renderer import GridRenderer
+    except ImportError:
+        print("[INFO] pygame is not installed, skipping draw_grid")
+        return
+    color_array = palette_colors(0, 15)
+    for w, h in sizes:
+        # Cell size of a window of at most about 1000 pixels, like the app's default 15 for 64x48
+        cell_size = max(1, min(15, 1000 // max(w, h)))
+        surface = pygame.Surface((w * cell_size, h * cell_size))
+        renderer = GridRenderer()
+        grid = np.random.default_rng(0).integers(0, 16, (h, w)).astype(np.uint8)
+
+        def run(surface=surface, renderer=renderer, grid=grid, cell_size=cell_size):
+            surface.fill(BACKGROUND_COLOR)
+            renderer.draw(surface, grid, cell_size, color_array, DEFAULT_DEAD_COLOR, GRID_COLOR)
+
+        yield f"draw_grid/{w}x{h}/cell{cell_size}", run, None, 1
+
+def text_cases():
+    try:
+        import convert_char_to_pixels
+    except ImportError:
+        print("[INFO] PIL is not installed, skipping initialize_grid_with_text")
+        return
+    cache = convert_char_to_pixels.glyph_cache
+    sim = Simulator(64, 48)
+
+    def clear():
+        cache.fonts.clear()
+        cache.texts.clear()
+
+    def run():
+        sim.initialize_grid_with_text("HeiChips", font_size=15)
+
+    yield "initialize_grid_with_text/cold", run, clear, 1
+    yield "initialize_grid_with_text/warm", run, None, 1
+
+def color_cases():
+    # palette_colors reports interpolated palettes on stdout
+    devnull = open(os.devnull, "w")
+    for bits in COLOR_BITS:
+        for index, palette in sorted(COLOR_PALETTES.items()):
+            def run(index=index, age_limit=2 ** bits - 1):
+                with contextlib.redirect_stdout(devnull):
+                    flicker_dead_color(palette_colors(index, age_limit))
+
+            yield f"update_color_array/{palette['name']}/{bits}bit", run, None, 1
+
+def run_benchmarks(sizes, repeats=REPEATS, name_filter=None):
+    """Results by case name"""
+    groups = [update_grid_cases(sizes, False), update_grid_cases(sizes, True), stepper_cases(sizes),
+              draw_grid_cases(sizes), text_cases(), color_cases()]
+    results = {}
+    for cases in groups:
+        for name, run, setup, per in cases:
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = measure(run, setup, repeats, per)
+            print(f"{name:<52} {results[name]['seconds'] * 1000:10.3f} ms")
+    return results
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Print the ratio of every result to the baseline, returns the names of the slower cases"""
+    slower = []
+    print(f"\n{'case':<52} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, now = baseline[name]["seconds"], result["seconds"]
+        ratio = now / before if before > 0 else float("inf")
+        mark = "slower" if ratio > threshold else "faster" if ratio < 1 / threshold else ""
+        if mark == "slower":
+            slower.append(name)
+        print(f"{name:<52} {before * 1000:8.3f}ms {now * 1000:8.3f}ms {ratio:6.2f}x {mark}")
+    missing = [name for name in baseline if name not in results]
+    if missing:
+        print(f"[INFO] {len(missing)} baseline cases were not run")
+    return slower
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark stepping, rendering, text seeding and palettes")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=SIZES, help="grid sizes like 64x48 600x600")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="samples per case")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="ratio to the baseline that counts as slower")
+    parser.add_argument("--fail-slower", action="store_true", help="exit with an error if a case is slower than the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, max(1, args.repeats), args.filter)
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "generations_per_sample": GENERATIONS,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        slower = compare(results, baseline, args.threshold)
+        if slower and args.fail_slower:
+            raise SystemExit(f"[ERROR] {len(slower)} cases are slower than the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import hashlib
+import numpy as np
+from engine import age_dtype, step_grid_age
+from cycles import state_digest
+
+# Bit-packed engine for plain BIRTH/SURVIVE rules.
+# Every row is packed into little-endian uint64 words (cell x is bit x % 64 of
+# word x // 64), neighbor counts are computed with bit-parallel adders on all
+# 64 cells of a word at once. Ages live in an optional side-plane that is only
+# brought up to date when ages() is called (e.g. when rendering).
+# Between syncs every generation is folded into packed counters: a bit-sliced
+# saturating count of the generations each cell has been alive in a row, and a
+# mask of the cells alive in every generation since the last sync, which just
+# add the elapsed generations to their age.
+# BitBoardStepper plugs the engine into Simulator.stepper (headless.py --bitboard).
+# It keeps the run on the board: Simulator.run() advances it without unpacking,
+# the cycle search hashes the packed words, and ages are only unpacked when the
+# simulator's grid is read.
+
+WORD = np.dtype('<u8')
+
+def pack_rows(alive):
+    """Pack a 2D boolean array into rows of uint64 words"""
+    h, w = alive.shape
+    words = -(-w // 64)
+    padded = np.zeros((h, words * 64), dtype=bool)
+    padded[:, :w] = alive
+    return np.packbits(padded, axis=1, bitorder='little').view(WORD)
+
+def unpack_rows(board, width):
+    """Unpack rows of uint64 words into a 2D boolean array of the given width"""
+    bits = np.unpackbits(board.view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :width].view(bool)
+
+def half_add(a, b):
+    return a ^ b, a & b
+
+def full_add(a, b, c):
+    t = a ^ b
+    return t ^ c, (a & b) | (c & t)
+
+def rule_mask(count_bits, rule):
+    """Combine the 4 count bitplanes into a mask of cells whose count is in rule"""
+    result = np.zeros_like(count_bits[0])
+    for n in rule:
+        if not 0 <= n <= 8:
+            continue
+        match = ~np.zeros_like(result)
+        for i, bit in enumerate(count_bits):
+            match &= bit if (n >> i) & 1 else ~bit
+        result |= match
+    return result
+
+class BitBoard:
+    """Liveness grid packed 64 cells per word with a lazily updated age side-plane"""
+
+    def __init__(self, grid, age_limit=None, track_ages=False):
+        self.height, self.width = grid.shape
+        self.board = pack_rows(grid > 0)
+        self.generation = 0
+
+        # Mask of the valid cells in the last word of every row
+        self.last_mask = np.uint64((1 << (self.width % 64)) - 1) if self.width % 64 else ~np.uint64(0)
+
+        self.age_limit = age_limit
+        self.age_plane = None
+        self.streak = None
+        if track_ages:
+            if grid.dtype == bool:
+                dtype = age_dtype(age_limit.bit_length()) if age_limit else np.dtype(np.uint8)
+            else:
+                dtype = grid.dtype
+            self.age_plane = np.array(grid, dtype=dtype)
+            dtype_max = int(np.iinfo(dtype).max)
+            self.ceiling = dtype_max if age_limit is None else min(age_limit, dtype_max)
+            self.start_streak()
+
+    def neighbor_bits(self):
+        """Return the 8-neighbor count of every cell as 4 bitplanes (1, 2, 4, 8)"""
+        b = self.board
+        one = np.uint64(1)
+        high = np.uint64(63)
+
+        # Horizontal neighbors, carrying edge bits across word boundaries
+        west = b << one
+        west[:, 1:] |= b[:, :-1] >> high
+        east = b >> one
+        east[:, :-1] |= b[:, 1:] << high
+        east[:, -1] &= self.last_mask
+
+        # Vertical neighbors, rows outside the grid are dead
+        def up(plane):
+            shifted = np.zeros_like(plane)
+            shifted[1:] = plane[:-1]
+            return shifted
+
+        def down(plane):
+            shifted = np.zeros_like(plane)
+            shifted[:-1] = plane[1:]
+            return shifted
+
+        # Sum every row of three with full adders, then add the row sums
+        u0, u1 = full_add(up(west), up(b), up(east))
+        m0, m1 = half_add(west, east)
+        d0, d1 = full_add(down(west), down(b), down(east))
+
+        bit0, c0 = full_add(u0, m0, d0)
+        t0, t1 = full_add(u1, m1, d1)
+        bit1, c1 = half_add(t0, c0)
+        bit2, bit3 = half_add(t1, c1)
+        return bit0, bit1, bit2, bit3
+
+    def step(self, birth, survive, generations=1):
+        """Advance the board by the given number of generations"""
+        for _ in range(generations):
+            count_bits = self.neighbor_bits()
+            born = ~self.board & rule_mask(count_bits, birth)
+            survivors = self.board & rule_mask(count_bits, survive)
+            self.board = born | survivors
+            self.board[:, -1] &= self.last_mask
+            self.generation += 1
+
+            if self.streak is not None:
+                self.count_streak()
+
+    def start_streak(self):
+        self.streak = [np.zeros_like(self.board) for _ in range(self.ceiling.bit_length())]
+        self.unbroken = self.board.copy()
+        self.pending = 0
+
+    def count_streak(self):
+        """Fold the current generation into the packed streak counters"""
+        # Saturating +1 for live cells, dead cells start again at 0
+        full = ~np.zeros_like(self.board)
+        for i, plane in enumerate(self.streak):
+            full &= plane if (self.ceiling >> i) & 1 else ~plane
+        carry = ~full
+        for i, plane in enumerate(self.streak):
+            self.streak[i] = (plane ^ carry) & self.board
+            carry &= plane
+        self.unbroken &= self.board
+        self.pending += 1
+
+    def sync_ages(self):
+        """Bring the age plane up to date with the generations since the last sync"""
+        if not self.pending:
+            return
+        dtype = self.age_plane.dtype
+        # Births start at 1 and survivors age by +1, so a cell's age is its streak,
+        # unless it was alive throughout: then the elapsed generations add to its age
+        streak = np.zeros((self.height, self.width), dtype=dtype)
+        for i, plane in enumerate(self.streak):
+            streak |= unpack_rows(plane, self.width).astype(dtype) << dtype.type(i)
+        elapsed = min(self.pending, self.ceiling)
+        aged = np.minimum(self.age_plane, dtype.type(self.ceiling - elapsed)) + dtype.type(elapsed)
+        self.age_plane = np.where(unpack_rows(self.unbroken, self.width), aged, streak)
+        self.start_streak()
+
+    def alive(self):
+        """Return the liveness plane as a 2D boolean array"""
+        return unpack_rows(self.board, self.width)
+
+    def ages(self):
+        """Return the age grid (same layout as gol.grid), syncing pending generations first"""
+        if self.age_plane is None:
+            return self.alive().view(np.uint8)
+        self.sync_ages()
+        return self.age_plane
+
+    def population(self):
+        """Number of live cells"""
+        return int(np.unpackbits(self.board.view(np.uint8)).sum())
+
+class BitBoardStepper:
+    """Simulator stepper that keeps plain-rule runs on a BitBoard, age influence is stepped unpacked"""
+
+    def __init__(self):
+        self.board = None
+        self.returned = None  # Last grid read back from the board, stepping it again needs no repack
+
+    def reset(self):
+        """Forget the board, the next step packs its grid again (the simulator calls it after edits)"""
+        self.board = None
+        self.returned = None
+
+    def step(self, grid, birth, survive, age_limit, birth_age=(), survive_age=(), age_influence=False):
+        """Advance the board by one generation and return None, materialize() reads it back
+
+        grid is None or the last materialized grid to continue on the board, any other grid is packed first.
+        With age influence the next generation is computed and returned like engine.step_grid_age."""
+        if grid is None:
+            grid = self.returned if self.returned is not None else self.materialize()
+        if age_influence:
+            self.reset()
+            return step_grid_age(grid, birth, survive, birth_age, survive_age, age_limit)
+
+        board = self.board
+        if board is None or grid is not self.returned or board.age_limit != age_limit:
+            board = self.board = BitBoard(grid, age_limit, track_ages=True)
+        board.step(birth, survive)
+        self.returned = None
+        return None
+
+    def materialize(self):
+        """Age grid of the board's generation, do not modify it without resetting the stepper"""
+        if self.returned is None:
+            self.returned = self.board.ages()
+        return self.returned
+
+    def state_digest(self, grid, liveness_only=True):
+        """Cycle search digest, hashed from the packed words when grid is the board's generation"""
+        if not liveness_only:
+            return state_digest(self.materialize() if grid is None else grid, False)
+        if grid is None or (self.board is not None and grid is self.returned):
+            words = self.board.board
+            shape = (self.board.height, self.board.width)
+        else:
+            words = pack_rows(grid > 0)
+            shape = grid.shape
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.array(shape, dtype=np.int64).tobytes())
+        h.update(words.tobytes())
+        return h.digest()
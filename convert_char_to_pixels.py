@@ -1,62 +1,110 @@
 from __future__ import print_function
 import string
+from collections import OrderedDict
 from PIL import Image, ImageFont, ImageDraw, ImageFilter, ImageOps
 import numpy as np
+from glyph_atlas import compose, lua_glyph, pixel_art
 
 FONT = "../../comic.ttf"
 
+# Text rasterization is cached per font: fonts are loaded once per
+# (path, size, bold), every character is rendered once into an alpha bitmap,
+# and strings are composed from these bitmaps with numpy. Overlapping glyphs
+# are blended like PIL does (a + b - a*b/255) and a pixel is set where the
+# alpha reaches 128, so the result is identical to drawing the whole string.
+# glyph_atlas.py stores the glyphs of a font for use without PIL.
+
+MAX_FONTS = 16   # Loaded fonts with their glyph bitmaps
+MAX_TEXTS = 256  # Composed strings
+IMAGE_TILE_ROWS = 256  # Image rows converted at once by convert_image
+
+class GlyphCache:
+    """LRU cache of fonts keyed by (path, size, bold), their glyph bitmaps and composed strings"""
+
+    def __init__(self, max_fonts=MAX_FONTS, max_texts=MAX_TEXTS):
+        self.max_fonts = max_fonts
+        self.max_texts = max_texts
+        self.font_paths = {}
+        self.fonts = OrderedDict()
+        self.texts = OrderedDict()
+
+    def font_path(self, font_name, bold):
+        """Path of a system font, None if it is not found (or pygame is not installed)"""
+        key = (font_name, bold)
+        if key not in self.font_paths:
+            try:
+                import pygame
+                pygame.font.init()
+                self.font_paths[key] = pygame.font.match_font(font_name, bold=bold)
+            except ImportError:
+                self.font_paths[key] = None
+        return self.font_paths[key]
+
+    def font(self, path, fontsize, bold=False):
+        """(font, glyphs) for a font file, PIL's default font if it cannot be loaded"""
+        key = (path, fontsize, bold)
+        entry = self.fonts.get(key)
+        if entry is None:
+            try:
+                font = ImageFont.truetype(path, fontsize) if path else ImageFont.load_default()
+            except (OSError, IOError):
+                # Fallback to default font if loading fails
+                font = ImageFont.load_default()
+            entry = (font, {})
+            self.fonts[key] = entry
+            if len(self.fonts) > self.max_fonts:
+                self.fonts.popitem(last=False)
+        else:
+            self.fonts.move_to_end(key)
+        return entry
+
+    def glyph(self, font, glyphs, char):
+        """(alpha bitmap, x offset of the bitmap, bounding box, advance) of a character"""
+        glyph = glyphs.get(char)
+        if glyph is None:
+            left, top, right, bottom = font.getbbox(char)
+            # Drawn with a margin so a negative left bearing is not cut off
+            margin = max(0, -left)
+            image = Image.new('L', (margin + max(right, 1), max(bottom, 1)), 0)
+            ImageDraw.Draw(image).text((margin, 0), char, font=font, fill=255)
+            glyph = (np.asarray(image).astype(np.int32), -margin, (left, top, right, bottom), round(font.getlength(char)))
+            glyphs[char] = glyph
+        return glyph
+
+    def pixels(self, text, path=None, fontsize=14, font_name=None, bold=False):
+        """Rows with set pixels of the rendered text, 1 where the text is drawn (read-only, shared)"""
+        if font_name:
+            path = self.font_path(font_name, bold)
+        key = (path, fontsize, bold, text)
+        arr = self.texts.get(key)
+        if arr is None:
+            arr = self.compose(text, *self.font(path, fontsize, bold))
+            arr.setflags(write=False)
+            self.texts[key] = arr
+            if len(self.texts) > self.max_texts:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return arr
+
+    def compose(self, text, font, glyphs):
+        return compose([self.glyph(font, glyphs, char) for char in text])
+
+glyph_cache = GlyphCache()
+
 def char_to_pixels(text, path=FONT, fontsize=14, font_name=None, bold=False):
     """
     Based on https://stackoverflow.com/a/27753869/190597 (jsheperd)
+    Composed from cached glyphs, the result is shared and read-only
     """
-    try:
-        if font_name:
-            # Try to use system font
-            import pygame
-            pygame.font.init()
-            
-            # Get font path for system font
-            font_path = pygame.font.match_font(font_name, bold=bold)
-            if font_path:
-                font = ImageFont.truetype(font_path, fontsize)
-            else:
-                # Fallback to default font
-                font = ImageFont.load_default()
-        else:
-            # Use provided path
-            font = ImageFont.truetype(path, fontsize)
-    except (OSError, IOError):
-        # Fallback to default font if loading fails
-        font = ImageFont.load_default()
-    
-    bbox = font.getbbox(text)
-    w, h = bbox[2] - bbox[0], bbox[3] - bbox[1]
-    h *= 3
-    image = Image.new('L', (w, h), 1)  
-    draw = ImageDraw.Draw(image)
-    draw.text((0, 0), text, font=font) 
-    arr = np.asarray(image)
-    arr2 = np.where(arr, 0, 1)
-    arr2 = arr2[(arr2 != 0).any(axis=1)]
-    return arr2
+    return glyph_cache.pixels(text, path, fontsize, font_name, bold)
 
 def display(arr, char):
-    print(f'["{char}"] = {{\n    height = {arr.shape[0]},\n    length = {arr.shape[1]},\n    points = {{')
-    conv_array = np.where(arr, arr, '0')
-    result = ""
-    #print('\n'.join([''.join(row) for row in result]))
-    for row in conv_array:
-        result += "{"
-        for column in row:
-            result += f"{column},"
-        result += "},\n"
-    result += "}},\n"
-    print(result)
-    pixel_example = np.where(arr, '#', ' ')
+    print(lua_glyph(arr, char))
     print("--[[")
-    print('\n'.join([''.join(row) for row in pixel_example]))
+    print(pixel_art(arr))
     print("--]]")
-    print(np.count_nonzero(pixel_example))
+    print(arr.size)
 
 def display_simple(arr, char):
     pixel_example = np.where(arr, '#', ' ')
@@ -83,31 +131,32 @@ def convert_string(text):
         display_simple(arr, c)
         print()
 
-def convert_image(path):
-    original_image = Image.open(path)
-    processed_image = original_image.convert(mode='RGB')
-    processed_image = ImageOps.posterize(processed_image,1)#.resize((11,11))#Image.NEAREST
-    processed_image = processed_image.convert(mode='L')
-
-    arr = np.asarray(processed_image)
-    print(arr)
-    unique_values = list(set(i for j in arr for i in j))
-    #arr = np.where(arr, 0, 1)
-    #arr = arr[(arr != 0).any(axis=1)] #remove all zero rows
-    #arr = np.where(arr, unique_values.index(arr), arr)
-    zero_value1 = max(unique_values)
-    arr = np.array([[map_to_index(y, unique_values, zero_value1, 255) for y in x] for x in arr])
-
-    #original_image.show() 
-    processed_image.show()
-    print(arr)
-    print(unique_values)
-    #print(arr2)
-    display(arr,":m:")
-
-def map_to_index(value, u_set, zero_value1, zero_value2):
-    if(value==zero_value1 or value==zero_value2):
-        return 0
-    return u_set.index(value)
-
-    
\ No newline at end of file
+def convert_image(path, max_size=None):
+    """
+    Index map of an image: its posterized gray levels numbered in ascending order,
+    the brightest level (the background) is 0. Scaled down to fit max_size (w, h) if given
+    """
+    image = Image.open(path)
+    if max_size is not None and (image.width > max_size[0] or image.height > max_size[1]):
+        image = image.copy()
+        image.thumbnail(max_size, Image.NEAREST)
+
+    # Converted in bands of rows, so large images need no full-size RGB copy
+    local = np.empty((image.height, image.width), dtype=np.uint8)
+    bands = []
+    levels = np.zeros(0, dtype=np.uint8)
+    for y in range(0, image.height, IMAGE_TILE_ROWS):
+        tile = image.crop((0, y, image.width, min(image.height, y + IMAGE_TILE_ROWS))).convert(mode='RGB')
+        tile = ImageOps.posterize(tile, 1).convert(mode='L')
+        values, inverse = np.unique(np.asarray(tile), return_inverse=True)
+        local[y:y + tile.height] = inverse.reshape(tile.height, tile.width)
+        bands.append((y, tile.height, values))
+        levels = np.union1d(levels, values)
+
+    # Number the levels of all bands together, the brightest one and white are dead
+    index = np.arange(len(levels), dtype=np.uint8)
+    index[(levels == levels.max()) | (levels == 255)] = 0
+    arr = np.empty_like(local)
+    for y, h, values in bands:
+        arr[y:y + h] = index[np.searchsorted(levels, values)][local[y:y + h]]
+    return arr
@@ -0,0 +1,121 @@
+import hashlib
+from collections import deque
+import numpy as np
+
+# Cycle detection and fast-forward.
+# Every generation's state is hashed into a bounded table (digest -> generation).
+# The state is the packed liveness plane for plain rules (ages never feed back
+# into the rule) and the full age grid with age influence. A repeated digest
+# gives the period and the transient (the generation the cycle starts at).
+# The grid itself is never compared, the Simulator reports edits and rule
+# changes through check(), and steppers that hash the grid while stepping
+# (parallel.BandedStepper) hand in their digest.
+#
+# Once a run is periodic, generation G is answered from the generation
+# reference + (G - reference) % period. Ages are extrapolated exactly: cells
+# alive in every phase of the cycle keep aging (up to the age limit), all other
+# cells have periodic ages once the cycle ran for one full period, which the
+# reference generation (the detection point) already has.
+
+MAX_HISTORY = 4096              # Longest detectable period
+MAX_PHASE_BYTES = 64 * 1024**2  # Keep the grids of one period in memory up to this size
+
+def state_digest(grid, liveness_only=True):
+    """128 bit digest of the grid's liveness plane, or of the full grid"""
+    data = np.packbits(grid > 0) if liveness_only else np.ascontiguousarray(grid)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array(grid.shape, dtype=np.int64).tobytes())
+    h.update(data.tobytes())
+    return h.digest()
+
+def combine_digests(shape, digests):
+    """Digest of a grid from the state digests of its row bands (computed in place of state_digest)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array(shape, dtype=np.int64).tobytes())
+    for digest in digests:
+        h.update(digest)
+    return h.digest()
+
+class CycleDetector:
+    """Bounded table of per-generation state digests that finds the period and transient of a run"""
+
+    def __init__(self, max_history=MAX_HISTORY):
+        self.max_history = max_history
+        self.signature = None
+        self.reset()
+
+    def reset(self):
+        self.table = {}
+        self.order = deque()
+        self.period = None
+        self.transient = None
+        self.reference = None
+        self.phases = None
+        self.always_alive = None
+
+    def check(self, signature, edited=False):
+        """Forget the history if the grid was edited or the rules changed since the last record"""
+        if edited or signature != self.signature:
+            self.reset()
+            self.signature = signature
+            return False
+        return True
+
+    def record(self, digest, generation):
+        """Record the state digest of a generation, returns True once a cycle is known
+        (the caller then sets reference to a copy of the grid and its generation)"""
+        if self.period is not None:
+            return True
+        first = self.table.get(digest)
+        if first is not None:
+            self.period = generation - first
+            self.transient = first
+            return True
+
+        self.table[digest] = generation
+        self.order.append(digest)
+        if len(self.order) > self.max_history:
+            del self.table[self.order.popleft()]
+        return False
+
+    def cached(self):
+        """True if generations can be answered from the grids of one period held in memory"""
+        return self.period is not None and self.period * self.reference[0].nbytes <= MAX_PHASE_BYTES
+
+    def scan_period(self, step):
+        # Steps one full period from the reference, finds the cells alive in every phase
+        grid = self.reference[0]
+        phases = [grid]
+        always_alive = grid > 0
+        for _ in range(self.period - 1):
+            grid = step(grid)
+            always_alive &= grid > 0
+            if self.cached():
+                phases.append(grid)
+        self.always_alive = always_alive
+        self.phases = phases if self.cached() else None
+
+    def extrapolate(self, generation, step, age_limit):
+        """Grid at the given generation (not before the detection point) of a periodic run"""
+        ref_grid, ref_generation = self.reference
+        offset = generation - ref_generation
+        if offset < 0:
+            raise ValueError(f"Generation {generation} is before the cycle reference {ref_generation}")
+        if self.always_alive is None:
+            self.scan_period(step)
+
+        phase = offset % self.period
+        if self.phases is not None:
+            grid = self.phases[phase]
+        else:
+            grid = ref_grid
+            for _ in range(phase):
+                grid = step(grid)
+
+        # Cells alive through the whole cycle gained one age per generation skipped
+        grid = grid.copy()
+        skipped = offset - phase
+        if skipped and self.always_alive.any():
+            ages = grid[self.always_alive].astype(np.int64) + skipped
+            grid[self.always_alive] = np.minimum(ages, age_limit)
+        return grid
@@ -0,0 +1,175 @@
+import argparse
+import os
+import queue
+import subprocess
+import threading
+import time
+import numpy as np
+from headless import add_simulation_arguments, setup_simulator
+from palettes import COLOR_PALETTES, DEFAULT_DEAD_COLOR, palette_colors, flicker_dead_color, find_palette, palette_lut, colorize
+
+# Headless video/GIF export.
+# Frames are rendered straight from the grid: ages go through the palette
+# lookup table (COLOR_ARRAY with the dead color in front) and cells are scaled
+# up with numpy, no pygame involved. The simulation runs on the main thread and
+# hands the grids to an encoder thread through a bounded queue. .gif files are
+# written frame by frame with PIL as palette images (no color quantization per
+# frame), every other extension is encoded by an ffmpeg process that reads raw
+# RGB frames. Either way memory stays bounded by the queue, not the run length.
+# Example:
+#   python export.py demo.webm --text HeiChips --preset 6 --end 600 --stride 2 --cell-size 8
+
+QUEUE_SIZE = 32  # Grids waiting for the encoder before the simulation blocks
+
+def scale_cells(image, cell_size):
+    """Repeat every cell cell_size times in both directions"""
+    if cell_size == 1:
+        return image
+    return np.repeat(np.repeat(image, cell_size, axis=0), cell_size, axis=1)
+
+class GifEncoder:
+    """Writes palette frames to an animated GIF as they arrive, encoded by PIL's GIF frame writer"""
+
+    def __init__(self, path, lut, cell_size, fps):
+        from PIL import Image, GifImagePlugin
+        self.Image = Image
+        self.gif = GifImagePlugin
+        self.path = path
+        self.cell_size = cell_size
+        self.duration = round(1000 / fps)
+        self.file = None
+        if len(lut) <= 256:
+            # Ages index the GIF palette directly
+            self.index_lut = np.arange(len(lut), dtype=np.uint8)
+            self.palette = lut.flatten().tolist()
+        else:
+            # More ages than GIF colors, quantize the lookup table once instead of every frame
+            quantized = Image.fromarray(lut[None]).quantize(256)
+            self.index_lut = np.array(quantized, dtype=np.uint8)[0]
+            self.palette = quantized.getpalette()[:768]
+
+    def add(self, grid):
+        indices = scale_cells(self.index_lut[np.minimum(grid, len(self.index_lut) - 1)], self.cell_size)
+        frame = self.Image.fromarray(indices, "P")
+        frame.putpalette(self.palette)
+        if self.file is None:
+            # Screen size, global palette and loop come from the first frame, every frame uses that palette
+            self.file = open(self.path, "wb")
+            header, _ = self.gif.getheader(frame, self.palette, {"loop": 0, "duration": self.duration, "optimize": False})
+            self.file.write(b"".join(header))
+        # Written straight away, only the frames waiting in the queue are held in memory
+        self.file.write(b"".join(self.gif.getdata(frame, duration=self.duration)))
+
+    def close(self):
+        if self.file is not None:
+            self.file.write(b";")  # GIF trailer
+            self.file.close()
+
+class FFmpegEncoder:
+    """Pipes raw RGB frames into an ffmpeg process"""
+
+    def __init__(self, path, lut, cell_size, fps, shape, ffmpeg="ffmpeg"):
+        self.lut = lut
+        self.cell_size = cell_size
+        height, width = shape[0] * cell_size, shape[1] * cell_size
+        command = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            # yuv420p needs even dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", path,
+        ]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        except FileNotFoundError:
+            raise SystemExit(f"[ERROR] {ffmpeg} not found, install ffmpeg or export a .gif")
+
+    def add(self, grid):
+        self.process.stdin.write(scale_cells(colorize(grid, self.lut), self.cell_size).tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise SystemExit(f"[ERROR] ffmpeg failed with exit code {self.process.returncode}")
+
+def encoder_loop(encoder, frames, errors):
+    while True:
+        grid = frames.get()
+        if grid is None:
+            break
+        if errors:
+            continue
+        try:
+            encoder.add(grid)
+        except (OSError, ValueError) as e:
+            errors.append(e)
+
+def export(sim, path, lut, start=0, end=300, stride=1, cell_size=8, fps=30, ffmpeg="ffmpeg"):
+    """Write generations start..end (every stride-th) of sim as a video or GIF, returns the frame count"""
+    if os.path.splitext(path)[1].lower() == ".gif":
+        encoder = GifEncoder(path, lut, cell_size, fps)
+    else:
+        encoder = FFmpegEncoder(path, lut, cell_size, fps, sim.grid.shape, ffmpeg)
+
+    frames = queue.Queue(QUEUE_SIZE)
+    errors = []
+    thread = threading.Thread(target=encoder_loop, args=(encoder, frames, errors), name="encoder", daemon=True)
+    thread.start()
+
+    count = 0
+    try:
+        for generation in range(start, end + 1, stride):
+            # Periodic runs are fast-forwarded by the simulator's cycle detection
+            sim.advance_to(generation)
+            frames.put(sim.grid.copy())
+            count += 1
+            if errors:
+                break
+    finally:
+        frames.put(None)
+        thread.join()
+    if errors:
+        raise SystemExit(f"[ERROR] Encoding failed: {errors[0]}")
+    encoder.close()
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a simulation run as a video or GIF without a display")
+    parser.add_argument("path", help="output file, .gif is written with PIL, anything else (.webm, .mp4) with ffmpeg")
+    add_simulation_arguments(parser)
+    parser.add_argument("--start", type=int, default=0, help="first generation to export")
+    parser.add_argument("--end", type=int, default=300, help="last generation to export")
+    parser.add_argument("--stride", type=int, default=1, help="export every n-th generation")
+    parser.add_argument("--cell-size", type=int, default=8, help="pixels per cell")
+    parser.add_argument("--palette", default="0", help="palette index or name")
+    parser.add_argument("--no-reverse", action="store_true", help="do not reverse the palette")
+    parser.add_argument("--no-flicker-reduction", action="store_true", help="keep the dead color for BIRTH 0 rules")
+    parser.add_argument("--fps", type=int, default=30, help="frame rate of the output")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg executable")
+    args = parser.parse_args(argv)
+
+    if args.start < 0 or args.end < args.start or args.stride < 1 or args.cell_size < 1 or args.fps < 1:
+        raise SystemExit("[ERROR] Need 0 <= start <= end, stride >= 1, cell size >= 1 and fps >= 1")
+    try:
+        palette = find_palette(args.palette)
+    except ValueError as e:
+        raise SystemExit(f"[ERROR] {e}")
+
+    sim = setup_simulator(args)
+    color_array = palette_colors(palette, sim.age_limit, not args.no_reverse)
+    dead_color = DEFAULT_DEAD_COLOR
+    # Same condition as gol.update_color_array, the gradient palette keeps the dead color
+    if (COLOR_PALETTES[palette]["colors"] is not None and 0 in sim.birth and len(color_array) > 0
+            and not args.no_flicker_reduction):
+        dead_color = flicker_dead_color(color_array)
+
+    export_start = time.perf_counter()
+    count = export(sim, args.path, palette_lut(color_array, dead_color), args.start, args.end,
+                   args.stride, args.cell_size, args.fps, args.ffmpeg)
+    export_time = time.perf_counter() - export_start
+
+    height, width = sim.grid.shape
+    print(f"[INFO] Exported {count} frames ({width * args.cell_size}x{height * args.cell_size}) to {args.path} "
+          f"in {export_time:.2f}s, {count / args.fps / export_time:.1f}x real time")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import argparse
+import json
+import string
+import numpy as np
+
+# Precomputed glyph atlas, so text can be put into the grid without PIL or a
+# font stack at runtime.
+#
+#   <base>.npy   bitplane: every glyph's pixels, np.packbits per row, all glyphs
+#                concatenated (uint8), loaded with np.load(mmap_mode='r')
+#   <base>.json  metrics index: font, bold and per size and character
+#                [offset, rows, columns, x, left, top, right, bottom, advance]
+#                offset  - first byte of the glyph in the bitplane
+#                rows    - bitmap rows from the top of the line
+#                columns - bitmap columns starting x pixels right of the pen
+#                left..bottom - bounding box of the character, advance - pen step
+#
+# Text is composed from the glyphs like PIL draws a string. The atlas only keeps
+# set pixels, not the antialiasing alpha, so where two neighboring characters
+# overlap the result can differ by a pixel from drawing the whole string.
+# Build and export to the ROM tables of the hardware side:
+#   python glyph_atlas.py build glyphs --font impact --sizes 12 15 24
+#   python glyph_atlas.py rom glyphs --size 24 --output glyphs.lua
+
+INK_ALPHA = 128  # Alpha at which PIL's drawing into the 'L' image marks a pixel
+
+def compose(glyphs):
+    """Rows with set pixels of glyphs (alpha bitmap, x offset, bounding box, advance) drawn one after another"""
+    if not glyphs:
+        return np.zeros((0, 0), dtype=np.int64)
+    placed = []
+    pen = 0
+    for glyph in glyphs:
+        placed.append((pen, glyph))
+        pen += glyph[3]
+
+    # Same image size as drawing the string: bounding box width, three times its height
+    left = min(x + g[2][0] for x, g in placed)
+    right = max(x + g[2][2] for x, g in placed)
+    top = min(g[2][1] for x, g in placed)
+    bottom = max(g[2][3] for x, g in placed)
+    w, h = right - left, (bottom - top) * 3
+    alpha = np.zeros((h, w), dtype=np.int32)
+    for x, (bitmap, offset, bbox, advance) in placed:
+        x0 = x + offset
+        x1, y1 = min(w, x0 + bitmap.shape[1]), min(h, bitmap.shape[0])
+        if x1 <= max(x0, 0) or y1 <= 0:
+            continue
+        # Blended like PIL blends overlapping glyphs
+        source = bitmap[:y1, max(0, -x0):x1 - x0]
+        target = alpha[:y1, max(0, x0):x1]
+        target += source - (target * source + 127) // 255
+    arr = (alpha >= INK_ALPHA).astype(np.int64)
+    return arr[(arr != 0).any(axis=1)]
+
+def lua_string(text):
+    """Quoted Lua string literal"""
+    escaped = "".join("\\" + c if c in '"\\' else c if c.isprintable() else f"\\{ord(c)}" for c in text)
+    return f'"{escaped}"'
+
+def lua_glyph(arr, char):
+    """ROM table entry of a glyph: height, length and the rows of points"""
+    result = f'[{lua_string(char)}] = {{\n    height = {arr.shape[0]},\n    length = {arr.shape[1]},\n    points = {{\n'
+    for row in arr:
+        result += "{" + "".join(f"{int(v)}," for v in row) + "},\n"
+    return result + "}},\n"
+
+def pixel_art(arr):
+    """Glyph as '#' and ' ' lines"""
+    return "\n".join("".join(row) for row in np.where(arr, "#", " "))
+
+class GlyphAtlas:
+    """Glyph atlas loaded from <base>.npy (memory-mapped) and <base>.json"""
+
+    def __init__(self, base):
+        with open(base + ".json") as f:
+            index = json.load(f)
+        self.font_name = index["font_name"]
+        self.path = index["path"]
+        self.bold = index["bold"]
+        self.sizes = {int(size): glyphs for size, glyphs in index["sizes"].items()}
+        self.bits = np.load(base + ".npy", mmap_mode="r")
+        self.glyphs = {}
+        self.texts = {}
+
+    def matches(self, font_name=None, bold=False):
+        """True if the atlas was built from this system font (or from a font file if font_name is None)"""
+        if font_name is None or self.font_name is None:
+            return font_name is None and self.font_name is None
+        return font_name.lower() == self.font_name.lower() and bold == self.bold
+
+    def covers(self, text, fontsize):
+        """True if every character of text is in the atlas at this size"""
+        glyphs = self.sizes.get(fontsize)
+        return glyphs is not None and all(c in glyphs for c in text)
+
+    def bitmap(self, fontsize, char):
+        """Set pixels of a glyph as a (rows, columns) bool array"""
+        offset, rows, columns = self.sizes[fontsize][char][:3]
+        packed = self.bits[offset:offset + rows * ((columns + 7) // 8)].reshape(rows, (columns + 7) // 8)
+        return np.unpackbits(packed, axis=1, count=columns).astype(bool)
+
+    def glyph(self, fontsize, char):
+        key = (fontsize, char)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            offset, rows, columns, x, left, top, right, bottom, advance = self.sizes[fontsize][char]
+            glyph = (self.bitmap(fontsize, char).astype(np.int32) * 255, x, (left, top, right, bottom), advance)
+            self.glyphs[key] = glyph
+        return glyph
+
+    def pixels(self, text, fontsize):
+        """Rows with set pixels of the text, 1 where the text is drawn (read-only, shared)"""
+        key = (fontsize, text)
+        arr = self.texts.get(key)
+        if arr is None:
+            arr = compose([self.glyph(fontsize, c) for c in text])
+            arr.setflags(write=False)
+            self.texts[key] = arr
+        return arr
+
+def build_atlas(base, sizes, path=None, font_name=None, bold=False, chars=string.printable):
+    """Render chars at the given sizes with PIL and write <base>.npy and <base>.json"""
+    from convert_char_to_pixels import FONT, glyph_cache
+    if path is None:
+        path = FONT
+    font_path = glyph_cache.font_path(font_name, bold) if font_name else path
+
+    planes = []
+    offset = 0
+    index = {"font_name": font_name, "path": font_path, "bold": bold, "sizes": {}}
+    for size in sizes:
+        font, glyphs = glyph_cache.font(font_path, size, bold)
+        metrics = index["sizes"][str(size)] = {}
+        for char in chars:
+            alpha, x, (left, top, right, bottom), advance = glyph_cache.glyph(font, glyphs, char)
+            packed = np.packbits(alpha >= INK_ALPHA, axis=1)
+            planes.append(packed.ravel())
+            metrics[char] = [offset, alpha.shape[0], alpha.shape[1], x, left, top, right, bottom, advance]
+            offset += packed.size
+
+    np.save(base + ".npy", np.concatenate(planes) if planes else np.zeros(0, dtype=np.uint8))
+    with open(base + ".json", "w") as f:
+        json.dump(index, f)
+    return offset
+
+def write_rom(atlas, fontsize, path):
+    """Write the glyphs of one size as the Lua ROM tables of convert_chars"""
+    with open(path, "w") as f:
+        f.write(f"-- {atlas.font_name or atlas.path} {fontsize}px\nreturn {{\n")
+        for char in atlas.sizes[fontsize]:
+            arr = atlas.pixels(char, fontsize)
+            f.write(lua_glyph(arr, char))
+            f.write("--[[\n" + pixel_art(arr) + "\n--]]\n")
+        f.write("}\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a glyph atlas or export it as ROM tables")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="render a font into <base>.npy and <base>.json")
+    build.add_argument("base", help="atlas path without extension")
+    build.add_argument("--sizes", type=int, nargs="+", default=[15], help="font sizes to render")
+    build.add_argument("--font", default=None, help="system font name")
+    build.add_argument("--path", default=None, help="font file, used if --font is not given")
+    build.add_argument("--bold", action="store_true", help="bold system font")
+    rom = commands.add_parser("rom", help="write one size of an atlas as Lua ROM tables")
+    rom.add_argument("base", help="atlas path without extension")
+    rom.add_argument("--size", type=int, required=True, help="font size to export")
+    rom.add_argument("--output", required=True, help="Lua file to write")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        size = build_atlas(args.base, args.sizes, args.path, args.font, args.bold)
+        print(f"[INFO] Wrote {args.base}.npy ({size} bytes) and {args.base}.json")
+    else:
+        atlas = GlyphAtlas(args.base)
+        if args.size not in atlas.sizes:
+            raise SystemExit(f"[ERROR] Size {args.size} is not in the atlas (sizes {sorted(atlas.sizes)})")
+        write_rom(atlas, args.size, args.output)
+        print(f"[INFO] Wrote {len(atlas.sizes[args.size])} glyphs to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 import pygame
-import numpy as np
-from convert_char_to_pixels import char_to_pixels
+from simulator import Simulator, RULE_PRESETS, AGE_RULE_PRESETS
+from renderer import GridRenderer
+from palettes import COLOR_PALETTES, DEFAULT_DEAD_COLOR, palette_colors, flicker_dead_color
+from text_cache import TextCache
+from sim_worker import SimulationWorker
+from scheduler import FrameScheduler
+from profiler import FrameProfiler
 import random
 import matplotlib.colors
 import os
+import time
 
 # Grid size
 GRID_SIZE_X = 64
@@ -33,7 +39,6 @@ RULE_BUTTON_HEIGHT = CELL_SIZE * 4
 RULE_TEXT_SIZE = CELL_SIZE * 2
 RULE_MARGIN = 2
 RULE_Y_OFFSET = GRID_SIZE_Y * CELL_SIZE + 20
-AGE_LIMIT = 15
 LAST_RULE = -1
 
 WINDOW_SIZE_X = GRID_SIZE_X * CELL_SIZE
@@ -50,67 +55,7 @@ TEXT_COLOR = (255, 255, 255)
 BUTTON_ON = (0, 180, 180)
 BUTTON_OFF = (60, 60, 60)
 #FONT = '../../impact.ttf'
-# Rule state
-
-RULE_PRESETS = [
-    (set([3]), set([2, 3])),          # 0: Conway's Life
-    (set([0, 8]), set([2, 3, 5, 6, 7])),   # 1:
-    (set([3, 5,6,7,8]), set([5,6,7,8])),      # 2: B35678/S5678 Diamoeba
-    (set([0, 7]), set([0, 2, 3])),   # 3:
-    (set([0]), set([0, 2, 4, 6])),# B0 S0246
-    (set([1, 2, 5]), set([2, 4, 5])),# 5:
-    (set([2, 4]), set([3, 4, 5])),   # 6:
-    #(set([3, 6, 8]), set([2, 3, 4])),# 7
-    (set([0,5,6]), set([0, 8])),
-    (set([1]), set([0,1,2,3,4,5,6,7,8])),# 8 fractal growth
-    (set([1,2,4,8]), set([0,2,7])),# 9:
-]
-#B2467 S45678
-AGE_RULE_PRESETS = [
-    # 0:
-    (set([3]), set([1, 2]), set([1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15]), set([1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 13, 14, 15])),
-    
-    # 1:
-    (set([0, 8]), set([2, 3, 5, 6, 7]), set([1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15]), set([1, 2, 4, 5, 6, 7, 8, 9, 11, 12, 13, 14, 15])),
-    
-    # 2:
-    (set([3, 6]), set([1, 2]), set([1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15]), set([1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15])),
-    
-    # 3:
-    (set([0, 7]), set([0, 2, 3]), set([1, 2, 3, 4, 5, 6, 8, 9, 10, 12, 13, 14, 15]), set([2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15])),
-    
-    # 4:
-    (set([0]), set([0, 2, 4, 6]), set([1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 13, 14, 15]), set([1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14])),
-    
-    # 5:
-    (set([1, 2, 5]), set([2, 4, 5]), set([1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15]), set([1, 2, 3, 4, 5, 7, 8, 9, 10, 12, 13, 14, 15])),
-    
-    # 6:
-    (set([2, 4]), set([3, 4, 5]), set([1, 2, 3, 4, 5, 6, 8, 9, 11, 12, 13, 14, 15]), set([1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12, 13, 15])),
-    
-    # 7:
-    (set([0, 5, 6]), set([0, 8]), set([1, 2, 3, 4, 5, 6, 7, 9, 10, 11, 12, 14, 15]), set([2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14])),
-    
-    # 8: gameboy shrinking window
-    (set([0,1,2,3,7,8]), set([0,1,2,3,4,5]), set([1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]), set([1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15])),
-    
-    # 9:Droplets preset
-    (set([1]), set([0,2,7]), set([1, 4, 6, 7, 8, 9, 11, 13, 14, 15]), set([2, 3, 4, 5, 6, 7, 8, 11, 12, 14])),
-]
-
-#Droplets
-#Randomized rules: BIRTH=[1], SURVIVE=[1, 3, 8]
-#Randomized age rules: BIRTH_AGE=[1, 4, 6, 7, 8, 9, 11, 13, 14, 15], SURVIVE_AGE=[2, 3, 4, 5, 6, 7, 8, 11, 12, 14]
-
-#Randomized rules: BIRTH=[0, 1, 2, 7, 8], SURVIVE=[0, 6]
-#Randomized age rules: BIRTH_AGE=[1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15], SURVIVE_AGE=[1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
-
-
-BIRTH = {0,8} #0178 #346        #2378  #34
-SURVIVE = {3,4,6,7,8} #067 #13678 #34568 #135679
-BIRTH_AGE = set() 
-SURVIVE_AGE = set() 
-BIRTH, SURVIVE = RULE_PRESETS[6]
+# Rule state and presets live in simulator.py
 
 
 # Config menu state
@@ -124,7 +69,9 @@ config_palette_reverse = True  # Whether to reverse the color palette
 config_grid_x = GRID_SIZE_X
 config_grid_y = GRID_SIZE_Y
 config_cell_size = CELL_SIZE
-config_fps = 10  # Frames per second for simulation
+config_fps = 10  # Generations per second for simulation
+config_max_speed = False  # Step as fast as possible instead of config_fps
+config_profile_overlay = False  # Show the per-frame phase timings over the grid
 config_flicker_reduction = True  # Whether to enable dead pixel flickering reduction for Birth 0 rules
 config_age_influence = False  # Whether to enable age-based influence on birth/survive rules
 config_age_resolution = 4  # Number of bits for age attribute
@@ -136,6 +83,10 @@ font_popup_scroll = 0
 # prevent clicking multiple times
 last_click_time = 0
 CLICK_DELAY = 250  # Milliseconds
+DISPLAY_FPS = 60  # Display refresh rate, independent of the simulation speed
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")  # Dropped files seeded as images
+PROFILE_LOG_EXTENSION = ".csv"  # L logs every frame to a .csv file, ".npy" keeps a ring buffer of the last frames
+GLYPH_ATLAS = "glyph_atlas"  # Prebuilt glyphs (glyph_atlas.npy/.json) used for the grid text if present
 
 screen = pygame.display.set_mode((WINDOW_SIZE_X, WINDOW_SIZE_Y))
 pygame.display.set_caption("Bag O' Life - Cellular Automaton Design Space Exploration")
@@ -148,6 +99,9 @@ if not available_fonts:
     print("[ERROR] No system fonts found.")
     available_fonts = ["arial", "helvetica", "times", "courier"]  # Fallback fonts
 
+# Cache for UI fonts and rendered labels, cleared by update_font
+text_cache = TextCache()
+
 # Try to use Impact font, fallback to other fonts if not available
 font = None
 try:
@@ -170,113 +124,28 @@ except Exception as e:
     print(f"[ERROR] Could not load any standard font, please install a font like Impact or Arial. {e}")
 
 
-# Initialize grid
-grid = np.zeros((GRID_SIZE_Y, GRID_SIZE_X), dtype=int)
+# Initialize simulator (rule state and grid), ages are stored in the smallest unsigned type that fits config_age_resolution bits
+sim = Simulator(GRID_SIZE_X, GRID_SIZE_Y, config_age_resolution, config_age_influence)
 running = False
-
-# Initialize color gradient for cell values 0-14
-def color_gradient(start_color, end_color, steps):
-    gradient = []
-    for i in range(steps):
-        r = int(start_color[0] + (end_color[0] - start_color[0]) * i / (steps - 1))
-        g = int(start_color[1] + (end_color[1] - start_color[1]) * i / (steps - 1))
-        b = int(start_color[2] + (end_color[2] - start_color[2]) * i / (steps - 1))
-        gradient.append((r, g, b))
-    return gradient
-
-def hex_to_rgb(hex):
-  return tuple(int(hex[i:i+2], 16) for i in (0, 2, 4))
-
-# Color palettes
-COLOR_PALETTES = {
-    0: {
-        "name": "Rainbow",
-        "colors": [
-            'FF0000', # Red
-            'FF4000', # Red-Orange
-            'FF8000', # Orange
-            'FFBF00', # Yellow-Orange
-            'FFFF00', # Yellow
-            'BFFF00', # Yellow-Green
-            '80FF00', # Green-Yellow
-            '40FF00', # Yellowish Green
-            '00FF00', # Green
-            '00FF80', # Green-Cyan
-            '00FFBF', # Cyan-Green
-            '00FFFF', # Cyan
-            '0080FF', # Blue-Cyan
-            '0000FF', # Blue
-            '4B0082', # Indigo
-            '8F00FF', # Violet
-        ]
-    },
-    1: {
-        "name": "Game Boy",
-        "colors": ['9BBC0F', '332c50', '332c50', '8BAC0F', '306230', '0F380F', '0F380F', '2D5A2D', '4F7F4F', '8BAC0F', '9BBC0F', 'ADCFAD', 'e0dbcd', 'a89f94', '706b66', '2b2b26']
-    },
-    2: {
-        "name": "Fire",
-        "colors": ['FFBA08', '03073E', '370617', '6A040F', '9D0208', 'D00000', 'DC2F02', 'E85D04', 'F48C06', 'FAA307', 'FFBA08']
-    },
-    3: {
-        "name": "turquoise",
-        "colors": ['D9ED92', 'B5E48C', '99D98C', '76C893', '52B69A', '34A0A4', '168AAD', '1A759F', '1E6091', '184E77', '0F4C75', '023E8A', '03045E', '001D3D', '000814', '30FFFF']
-    },
-    6: {
-        "name": "Pastel",
-        "colors": ['FBF8CC', 'FDE4CF', 'FFCFD2', 'F1C0E8', 'CFBAF0', 'A3C4F3', '90DBF4', '8EECF5', '98F5E1', 'B9FBC0', 'B9FFC0', 'B9FFDD', 'B9FFEE', 'B9FFFF', '800000', 'FFFFFF']
-    },
-    4: {
-        "name": "Green-Blue",
-        "colors": ['D9ED92', 'B5E48C','99D98C','76C893','52B69A','34A0A4','168AAD','1A759F','1E6091','184E77','0F4C75','023E8A','03045E','FFFFFF']
-    },
-    5: {
-        "name": "Gradient",
-        "colors": None  # Will use color_gradient function
-    },
-    7: {
-        "name": "Purple", 
-        "colors": ['F72585', 'B5179E', '7209B7', '560BAD', '480CA8', '3A0CA3', '3F37C9', '4361EE', '4895EF', '4CC9F0', '7209B7', '480CA8', '3A0CA3', '240046', '10002B', 'FFFF30']
-    },
-    8: {
-        "name": "Watermelon",
-        "colors": ['EF476F', 'FFD166', '06D6A0', '118AB2', '073B4C', 'F72C25', 'F8961E', 'F9C74F', '90E0EF', '0077B6', '023047', '8ECAE6', '219EBC', '126782', '0A4D68', 'DDFFFF']
-    },
-    9: {
-        "name": "Ocean Blue",
-        "colors": ['03045E', '023E8A', '0077B6', '0096C7', '00B4D8', '48CAE4', '90E0EF', 'ADE8F4', 'CAF0F8', 'E0F4FF', '87CEEB', '5F9EA0', '4682B4', '1E90FF', '0000CD', 'DDFFFF']
-    },
-    10: {
-        "name": "Warm",
-        "colors": ['FBF8CC', 'FFF8DC', 'FFF0F5', 'FFE4E1', 'FFDAB9', 'FFC0CB', 'FFA07A', 'FF7F50', 'FF6347', 'FF4500', 'FF0000', 'DC143C', 'B22222', '8B0000', '800000', 'FFFFFF']
-    },
-}
+if os.path.exists(GLYPH_ATLAS + ".json"):
+    try:
+        sim.load_glyph_atlas(GLYPH_ATLAS)
+        print(f"[INFO] Using glyph atlas {GLYPH_ATLAS}")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[ERROR] Could not load glyph atlas {GLYPH_ATLAS}: {e}")
 
 def update_color_array(log=True):
     """Update COLOR_ARRAY based on selected palette and age resolution"""
-    global COLOR_ARRAY, DEAD_COLOR, AGE_LIMIT
+    global COLOR_ARRAY, DEAD_COLOR
     
-    # Update AGE_LIMIT based on age resolution
-    AGE_LIMIT = (2 ** config_age_resolution) - 1
+    # Update the simulator's age limit based on age resolution
+    sim.set_age_resolution(config_age_resolution)
+    AGE_LIMIT = sim.age_limit
     
     palette = COLOR_PALETTES[config_palette]
+    COLOR_ARRAY = palette_colors(config_palette, AGE_LIMIT, config_palette_reverse, ALIVE_COLOR, SPECIAL2_COLOR)
     
-    if palette["colors"] is None:  # Gradient palette
-        COLOR_ARRAY = color_gradient((0,20,0), ALIVE_COLOR, 8) + color_gradient(ALIVE_COLOR, SPECIAL2_COLOR, 7)[1:]
-        if AGE_LIMIT > 15:
-            COLOR_ARRAY = color_gradient((0,20,0), ALIVE_COLOR, AGE_LIMIT//2) + color_gradient(ALIVE_COLOR, SPECIAL2_COLOR, AGE_LIMIT//2 + 1)[1:]
-    else:
-        hex_colors = palette["colors"].copy()
-        if config_palette_reverse:
-            hex_colors.reverse()
-        base_colors = [hex_to_rgb(hex_color) for hex_color in hex_colors]
-        
-        # interpolate colors if AGE_LIMIT exceeds hardcoded palette
-        if config_age_influence != 4 and AGE_LIMIT > len(base_colors) - 1:
-            COLOR_ARRAY = interpolate_colors(base_colors, AGE_LIMIT)
-        else:
-            COLOR_ARRAY = base_colors
-        
+    if palette["colors"] is not None:
         # If Birth 0 is active and flicker reduction is enabled, set dead color to reduced first color
         # This should reduce flickering when cells toggle each frame
         if log:
@@ -287,54 +156,14 @@ def update_color_array(log=True):
                 r, g, b = color
                 print(f"\033[48;2;{r};{g};{b}m  \033[0m", end="")
             print()
-        if 0 in BIRTH and len(COLOR_ARRAY) > 0 and config_flicker_reduction:
+        if 0 in sim.birth and len(COLOR_ARRAY) > 0 and config_flicker_reduction:
             print("[INFO] BIRTH 0 is active, changing dead pixel color to reduce flickering")
-            first_color = COLOR_ARRAY[0]
-            # Reduce each RGB component by 20% (multiply by 0.8)
-            reduced_color = tuple(max(0, int(c * 0.6)) for c in first_color)
-            DEAD_COLOR = reduced_color
-            r, g, b = reduced_color
+            DEAD_COLOR = flicker_dead_color(COLOR_ARRAY)
+            r, g, b = DEAD_COLOR
             print(f"\033[48;2;{r};{g};{b}m  \033[0m", end="")
             print()
         else:
-            DEAD_COLOR = (30, 30, 30)
-
-def interpolate_colors(base_colors, target_count):
-    """Interpolate colors to create a palette with target_count colors"""
-    print("number of colors in palette do not match AGE_LIMIT -> interpolating colors")
-    if target_count <= len(base_colors):
-        return base_colors[:target_count]
-    
-    result = []
-    # Calculate how many interpolated colors we need between each pair
-    segments = len(base_colors) - 1
-    colors_per_segment = target_count // segments
-    remaining = target_count % segments
-    
-    for i in range(segments):
-        start_color = base_colors[i]
-        end_color = base_colors[i + 1]
-        
-        # Add extra color to some segments if we have remainder
-        segment_colors = colors_per_segment + (1 if i < remaining else 0)
-        
-        # Generate interpolated colors for this segment
-        for j in range(segment_colors):
-            if j == 0:
-                result.append(start_color)
-            else:
-                # Interpolate between start and end
-                ratio = j / segment_colors
-                r = int(start_color[0] + (end_color[0] - start_color[0]) * ratio)
-                g = int(start_color[1] + (end_color[1] - start_color[1]) * ratio)
-                b = int(start_color[2] + (end_color[2] - start_color[2]) * ratio)
-                result.append((r, g, b))
-    
-    # Add the final color
-    if len(result) < target_count:
-        result.append(base_colors[-1])
-    
-    return result[:target_count]
+            DEAD_COLOR = DEFAULT_DEAD_COLOR
 
 # Initialize with default palette
 update_color_array()
@@ -349,91 +178,19 @@ def can_click():
         return True
     return False
 
+# Palette lookup and cached surfaces instead of per-cell draw calls
+grid_renderer = GridRenderer()
+
 def draw_grid(surface, grid):
     surface.fill(BACKGROUND_COLOR)
-    
-    # Fill only the game area with dead color
-    game_area_rect = pygame.Rect(0, 0, GRID_SIZE_X * CELL_SIZE, GRID_SIZE_Y * CELL_SIZE)
-    pygame.draw.rect(surface, DEAD_COLOR, game_area_rect)
-    
-    for y in range(GRID_SIZE_Y):    
-        for x in range(GRID_SIZE_X):
-            rect = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            val = grid[y][x]
-            if val > 0 and val < len(COLOR_ARRAY):
-                pygame.draw.rect(surface, COLOR_ARRAY[val-1], rect)
-            elif val >= len(COLOR_ARRAY):
-                pygame.draw.rect(surface, COLOR_ARRAY[-1], rect)
-                # print(f"Value {val} exceeds color array bounds.")
-            pygame.draw.rect(surface, GRID_COLOR, rect, 1)
+    grid_renderer.draw(surface, grid, CELL_SIZE, COLOR_ARRAY, DEAD_COLOR, GRID_COLOR)
 
-def update_grid(grid):
-    new_grid = np.copy(grid)
-    for y in range(GRID_SIZE_Y):
-        for x in range(GRID_SIZE_X):
-            self = grid[y][x]
-            
-            if config_age_influence:
-                # Age-based rule: count neighbors if their age is in BIRTH_AGE and SURVIVE_AGE
-                birth_neighbors = 0
-                survive_neighbors = 0
-                
-                for dy in range(-1, 2):
-                    for dx in range(-1, 2):
-                        # if dy == 0 and dx == 0:  # Skip center cell
-                        #     continue
-                        ny, nx = y + dy, x + dx
-                        if 0 <= ny < GRID_SIZE_Y and 0 <= nx < GRID_SIZE_X:
-                            neighbor_age = grid[ny][nx]
-                            if neighbor_age > 0:  # Alive neighbor
-                                # Check if neighbor age is in BIRTH_AGE set
-                                if neighbor_age in BIRTH_AGE:
-                                    birth_neighbors += 1
-                                # Check if neighbor age is in SURVIVE_AGE set
-                                if neighbor_age in SURVIVE_AGE:
-                                    survive_neighbors += 1
-                
-                if self > 0:
-                    # Cell is alive, check survival with age-filtered neighbors
-                    new_grid[y][x] = min(self + 1 if (survive_neighbors - 1) in SURVIVE else 0, AGE_LIMIT)
-                else:
-                    # Cell is dead, check birth with age-filtered neighbors
-                    new_grid[y][x] = 1 if birth_neighbors in BIRTH else 0
-            else:
-                # Default logic: Count neighbors as cells with value >= 1
-                neighbors = np.count_nonzero(
-                    grid[max(y-1, 0):min(y+2, GRID_SIZE_Y),
-                         max(x-1, 0):min(x+2, GRID_SIZE_X)] >= 1
-                )
-                # Exclude the center cell from neighbor count
-                # if self > 0:
-                #     neighbors -= 1
-                
-                if self > 0:
-                    new_grid[y][x] = self + 1 if (neighbors - 1) in SURVIVE else 0
-                    # if neighbors > 8:
-                        #print(f"survive {self} {neighbors}")
-                else:
-                    new_grid[y][x] = 1 if neighbors in BIRTH else 0
-                    if neighbors > 8:
-                        print(f"birth {self} {neighbors}")
-    return new_grid
-
-def initialize_grid_with_text(text, grid_size_x=GRID_SIZE_X, grid_size_y=GRID_SIZE_Y, font_size=12, font_name=None, bold=False):
-    pixel_array = char_to_pixels(text, fontsize=font_size, font_name=font_name, bold=bold)
-
-    #pixel_array = np.where(pixel_array != 0, 1, 0) # map all nonzero pixels to 1
-    grid = np.zeros((grid_size_y, grid_size_x), dtype=int)
-    h, w = pixel_array.shape
-    if h > grid_size_y or w > grid_size_x:
-        raise ValueError(f"Text too large to fit in {grid_size_x}x{grid_size_y} grid (got {w}x{h})")
-    start_y = (grid_size_y - h) // 2
-    start_x = (grid_size_x - w) // 2
-    grid[start_y:start_y + h, start_x:start_x + w] = pixel_array
-    return grid
+def draw_grid_changes(surface, grid):
+    """Redraw only the changed cells, returns the dirty rects for pygame.display.update"""
+    return grid_renderer.draw_changed(surface, grid, CELL_SIZE, COLOR_ARRAY, DEAD_COLOR, GRID_COLOR)
 
 def draw_rule_buttons(surface, rule_set, label, y_offset):
-    label_surface = font.render(label, True, TEXT_COLOR)
+    label_surface = text_cache.render(font, label, TEXT_COLOR)
     surface.blit(label_surface, (5, y_offset - 20))
     buttons = []
     for i in range(9):
@@ -444,8 +201,8 @@ def draw_rule_buttons(surface, rule_set, label, y_offset):
         pygame.draw.rect(surface, TEXT_COLOR, rect, 1)
         
         # Use RULE_TEXT_SIZE for the numbers in the buttons
-        rule_font = pygame.font.SysFont(config_font_name, RULE_TEXT_SIZE)
-        text = rule_font.render(str(i), True, TEXT_COLOR)
+        rule_font = text_cache.font(config_font_name, RULE_TEXT_SIZE)
+        text = text_cache.render(rule_font, str(i), TEXT_COLOR)
         text_rect = text.get_rect(center=rect.center)
         surface.blit(text, text_rect)
         buttons.append((rect, i))
@@ -453,8 +210,7 @@ def draw_rule_buttons(surface, rule_set, label, y_offset):
 
 def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical=False):
     """Draw age rule buttons for values 1-15"""
-    print(rule_set)
-    label_surface = font.render(label, True, TEXT_COLOR)
+    label_surface = text_cache.render(font, label, TEXT_COLOR)
     
     # Reduce age rule button size by 20%
     age_button_width = int(RULE_BUTTON_WIDTH * 0.8)
@@ -466,8 +222,8 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
         surface.blit(label_surface, (x_offset, y_offset - 20))
         buttons = []
         # Create 16 buttons (1-16) in a 2-column layout for symmetry
-        column_number = -(-AGE_LIMIT // 8)
-        for i in range(1, AGE_LIMIT + 2):
+        column_number = -(-sim.age_limit // 8)
+        for i in range(1, sim.age_limit + 2):
             col = (i-1) % column_number  # Column 0 or 1
             row = (i-1) // column_number  # Row number
             
@@ -475,12 +231,12 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
                              y_offset + row * (age_button_height + RULE_MARGIN),
                              age_button_width, age_button_height)
             
-            if i == AGE_LIMIT + 1:
+            if i == sim.age_limit + 1:
                 # Age 0 is invalid
                 pygame.draw.rect(surface, BUTTON_ON, rect)
                 pygame.draw.rect(surface, TEXT_COLOR, rect, 1)
 
-                rule_font = pygame.font.SysFont(config_font_name, age_text_size)
+                rule_font = text_cache.font(config_font_name, age_text_size)
                 # text = rule_font.render("X", True, (100, 100, 100))  # Gray X to show invalid
                 # text_rect = text.get_rect(center=rect.center)
                 # surface.blit(text, text_rect)
@@ -490,8 +246,8 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
                 pygame.draw.rect(surface, color, rect)
                 pygame.draw.rect(surface, TEXT_COLOR, rect, 1)
                 
-                rule_font = pygame.font.SysFont(config_font_name, age_text_size)
-                text = rule_font.render(str(i), True, TEXT_COLOR)
+                rule_font = text_cache.font(config_font_name, age_text_size)
+                text = text_cache.render(rule_font, str(i), TEXT_COLOR)
                 text_rect = text.get_rect(center=rect.center)
                 surface.blit(text, text_rect)
                 buttons.append((rect, i))
@@ -503,7 +259,7 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
         # Create 16 buttons (0-15) in horizontal rows for symmetry
         buttons_per_row = min(16, (WINDOW_SIZE_X - 100) // (age_button_width + RULE_MARGIN))
         
-        for i in range(1, AGE_LIMIT + 2):
+        for i in range(1, sim.age_limit + 2):
             col = i % buttons_per_row
             row = i // buttons_per_row
             
@@ -511,14 +267,14 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
                              y_offset + row * (age_button_height + RULE_MARGIN),
                              age_button_width, age_button_height)
             
-            if i ==AGE_LIMIT + 1:
+            if i ==sim.age_limit + 1:
                 # Age 0 is invalid - draw as disabled/empty box
                 color = (30, 30, 30)  # Dark gray for disabled
                 pygame.draw.rect(surface, color, rect)
                 pygame.draw.rect(surface, (60, 60, 60), rect, 1)  # Darker border
                 
-                rule_font = pygame.font.SysFont(config_font_name, age_text_size)
-                text = rule_font.render("X", True, (100, 100, 100))  # Gray X to show invalid
+                rule_font = text_cache.font(config_font_name, age_text_size)
+                text = text_cache.render(rule_font, "X", (100, 100, 100))  # Gray X to show invalid
                 text_rect = text.get_rect(center=rect.center)
                 surface.blit(text, text_rect)
                 # Don't add to clickable buttons
@@ -527,8 +283,8 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
                 pygame.draw.rect(surface, color, rect)
                 pygame.draw.rect(surface, TEXT_COLOR, rect, 1)
                 
-                rule_font = pygame.font.SysFont(config_font_name, age_text_size)
-                text = rule_font.render(str(i), True, TEXT_COLOR)
+                rule_font = text_cache.font(config_font_name, age_text_size)
+                text = text_cache.render(rule_font, str(i), TEXT_COLOR)
                 text_rect = text.get_rect(center=rect.center)
                 surface.blit(text, text_rect)
                 buttons.append((rect, i))
@@ -536,93 +292,92 @@ def draw_age_rule_buttons(surface, rule_set, label, x_offset, y_offset, vertical
     return buttons
 
 def handle_rule_click(mouse_pos, birth_buttons, survive_buttons, birth_age_buttons=None, survive_age_buttons=None):
-    global LAST_RULE, BIRTH, SURVIVE, BIRTH_AGE, SURVIVE_AGE
+    global LAST_RULE
     
     if not can_click():
         return False
     
     for rect, val in birth_buttons:
         if rect.collidepoint(mouse_pos):
-            if val in BIRTH:
-                BIRTH.remove(val)
+            if val in sim.birth:
+                sim.birth.remove(val)
             else:
-                BIRTH.add(val)
+                sim.birth.add(val)
             return True
     
     # Check survive buttons if no birth button was clicked
     for rect, val in survive_buttons:
         if rect.collidepoint(mouse_pos):
-            if val in SURVIVE:
-                SURVIVE.remove(val)
+            if val in sim.survive:
+                sim.survive.remove(val)
             else:
-                SURVIVE.add(val)
+                sim.survive.add(val)
             return True
     
     # Check birth age buttons if provided
     if birth_age_buttons:
         for rect, val in birth_age_buttons:
             if rect.collidepoint(mouse_pos):
-                if val in BIRTH_AGE:
-                    BIRTH_AGE.remove(val)
+                if val in sim.birth_age:
+                    sim.birth_age.remove(val)
                 else:
-                    BIRTH_AGE.add(val)
+                    sim.birth_age.add(val)
                 return True
     
     # Check survive age buttons if provided
     if survive_age_buttons:
         for rect, val in survive_age_buttons:
             if rect.collidepoint(mouse_pos):
-                if val in SURVIVE_AGE:
+                if val in sim.survive_age:
                     # Deactivating: remove this value and all higher values
-                    SURVIVE_AGE.remove(val)
+                    sim.survive_age.remove(val)
                     # Remove all values greater than val
-                    ages_to_remove = [age for age in SURVIVE_AGE if age > val]
+                    ages_to_remove = [age for age in sim.survive_age if age > val]
                     for age in ages_to_remove:
-                        SURVIVE_AGE.remove(age)
+                        sim.survive_age.remove(age)
                 else:
                     # Activating: add this value and all lower values
-                    SURVIVE_AGE.add(val)
+                    sim.survive_age.add(val)
                     # Add all values less than val (starting from 1, since age 0 doesn't exist)
                     for age in range(1, val):
-                        SURVIVE_AGE.add(age)
+                        sim.survive_age.add(age)
                 return True
     
     return False
 
 def randomize_rules():
-    global BIRTH, SURVIVE, BIRTH_AGE, SURVIVE_AGE
-    BIRTH = set(random.sample(range(9), random.randint(0, 5)))
-    SURVIVE = set(random.sample(range(9), random.randint(0, 5)))
+    sim.birth = set(random.sample(range(9), random.randint(0, 5)))
+    sim.survive = set(random.sample(range(9), random.randint(0, 5)))
     
     # Also randomize age rules if age influence is enabled
     if config_age_influence:
         # Randomize age sets with ages 1 to AGE_LIMIT
-        age_range = list(range(1, AGE_LIMIT + 1))  # Use dynamic AGE_LIMIT range
+        age_range = list(range(1, sim.age_limit + 1))  # Use dynamic AGE_LIMIT range
         
         # For BIRTH_AGE: High chance (80%) to keep almost all ages (remove only 0-3 random ages)
         if random.random() < 0.8:
             # Keep most ages, remove only 0-3 random ones
             ages_to_remove = random.randint(0, 3)
-            BIRTH_AGE = set(age_range)
+            sim.birth_age = set(age_range)
             
             if ages_to_remove > 0:
                 birth_remove = random.sample(age_range, min(ages_to_remove, len(age_range)))
-                BIRTH_AGE -= set(birth_remove)
+                sim.birth_age -= set(birth_remove)
         else:
             # Lower chance (20%) for more selective age rules (keep 5-10 ages or proportional to AGE_LIMIT)
-            max_count = min(10, AGE_LIMIT)
+            max_count = min(10, sim.age_limit)
             birth_count = random.randint(5, max_count)
-            BIRTH_AGE = set(random.sample(age_range, birth_count))
+            sim.birth_age = set(random.sample(age_range, birth_count))
         
         # For SURVIVE_AGE: Use cascading behavior (contiguous range from 1 to a random cutoff)
         # Pick a random cutoff point from 1 to AGE_LIMIT
-        cutoff_age = random.randint(1, AGE_LIMIT)
-        SURVIVE_AGE = set(range(1, cutoff_age + 1))
+        cutoff_age = random.randint(1, sim.age_limit)
+        sim.survive_age = set(range(1, cutoff_age + 1))
         
-        print(f"Randomized rules: BIRTH={sorted(BIRTH)}, SURVIVE={sorted(SURVIVE)}")
-        print(f"Randomized age rules: BIRTH_AGE={sorted(BIRTH_AGE)}, SURVIVE_AGE={sorted(SURVIVE_AGE)}")
+        print(f"Randomized rules: BIRTH={sorted(sim.birth)}, SURVIVE={sorted(sim.survive)}")
+        print(f"Randomized age rules: BIRTH_AGE={sorted(sim.birth_age)}, SURVIVE_AGE={sorted(sim.survive_age)}")
     else:
-        print(f"Randomized rules: BIRTH={sorted(BIRTH)}, SURVIVE={sorted(SURVIVE)}")
+        print(f"Randomized rules: BIRTH={sorted(sim.birth)}, SURVIVE={sorted(sim.survive)}")
     
     #update COLOR_ARRAY to handle cases where BIRTH 0 is an active rule
     update_color_array(False)
@@ -639,7 +394,7 @@ def update_window_size():
         age_button_height = int(RULE_BUTTON_HEIGHT * 0.8)
         
         # Calculate number of columns needed for age buttons (8 buttons per column)
-        column_number = -(-AGE_LIMIT // 8)
+        column_number = -(-sim.age_limit // 8)
         
         # Calculate horizontal layout requirements (16 buttons in a row)
         horizontal_width_needed = 50 + 16 * (age_button_width + RULE_MARGIN) + 50
@@ -676,7 +431,9 @@ def update_window_size():
 
 def update_font():
     global font
-    font = pygame.font.SysFont(config_font_name, 15)
+    # Cached fonts and text surfaces belong to the old font settings
+    text_cache.clear()
+    font = text_cache.font(config_font_name, 15)
 
 def draw_help_box(surface):
     # Calculate position to the right of the rule buttons
@@ -684,63 +441,105 @@ def draw_help_box(surface):
     
     help_y = RULE_Y_OFFSET
     help_height = RULE_BUTTON_HEIGHT * 2 + 10  # Same height as both rule sections
-    help_width = max(100, help_height)
     
-    # Only draw if there's enough space
-    if help_width > 100:  # Minimum width check
-        # Draw background box
-        pygame.draw.rect(surface, (40, 40, 40), (help_x, help_y, help_width, help_height))
-        pygame.draw.rect(surface, TEXT_COLOR, (help_x, help_y, help_width, help_height), 2)
-        
-        # Help text
-        help_texts = [
-            "CONTROLS:",
-            "",
-            "ESC - Menu",
-            "SPACE - Play/Pause",
-            "C - Clear grid",
-            "H - Reset to text",
-            "R - Random rules",
-            "0-9 - Rule presets",
-            "",
-            "Age Rules: " + ("ON" if config_age_influence else "OFF"),
-        ]
-        
-        # Render text lines
-        line_height = 15
-        total_text_height = len([t for t in help_texts if t != ""]) * line_height  # Count non-empty lines
-        start_y = help_y + (help_height - total_text_height + line_height) // 2  # Center vertically
-        
-        # Pre-render all text surfaces and find the widest line
-        max_width = 0
-        help_font = pygame.font.SysFont(config_font_name, 12)
-        rendered_lines = []
-        
-        for text_line in help_texts:
-            if text_line != "":
-                if text_line == "CONTROLS:":
-                    text_surface = help_font.render(text_line, True, (255, 255, 0))
-                else:
-                    text_surface = help_font.render(text_line, True, TEXT_COLOR)
-                rendered_lines.append(text_surface)
-                max_width = max(max_width, text_surface.get_width())
+    # Help text
+    help_texts = [
+        "CONTROLS:",
+        "",
+        "ESC - Menu",
+        "SPACE - Play/Pause",
+        "C - Clear grid",
+        "H - Reset to text",
+        "R - Random rules",
+        "0-9 - Rule presets",
+        "+/- - Speed",
+        "F - Max speed",
+        "W - Record",
+        "S - Save .rle",
+        "P - Profiler",
+        "L - Profile log",
+        "",
+        "Age Rules: " + ("ON" if config_age_influence else "OFF"),
+        "Speed: " + ("MAX" if config_max_speed else f"{config_fps} gen/s"),
+        f"Generation: {sim_worker.latest()[1]}",
+        "Recording: " + ("ON" if sim_worker.recorder is not None else "OFF"),
+        f"Period: {sim.cycles.period} from {sim.cycles.transient}" if sim.cycles.period else "Period: -",
+        f"Tiles skipped: {sim.stepper.skipped_tiles}/{sim.stepper.tile_count}",
+        "",
+    ] + frame_scheduler.status_lines()
+    
+    # Pre-render all text surfaces
+    line_height = 15
+    help_font = text_cache.font(config_font_name, 12)
+    rendered_lines = []
+    for text_line in help_texts:
+        if text_line != "":
+            color = (255, 255, 0) if text_line == "CONTROLS:" else TEXT_COLOR
+            rendered_lines.append(text_cache.render(help_font, text_line, color))
+        else:
+            rendered_lines.append(None)  # Placeholder for empty lines
+    
+    # Lines that do not fit below each other continue in the next column
+    columns = [[]]
+    text_y = 0
+    for text_surface in rendered_lines:
+        step = line_height // 2 if text_surface is None else line_height
+        if text_y + step > help_height - 20 and columns[-1]:
+            columns.append([])
+            text_y = 0
+        if text_surface is None and not columns[-1]:
+            continue  # No empty line at the top of a column
+        columns[-1].append(text_surface)
+        text_y += step
+    column_widths = [max([t.get_width() for t in column if t is not None] or [0]) for column in columns]
+    help_width = max(100, help_height, sum(column_widths) + 20 * len(columns))
+    
+    # Draw background box
+    pygame.draw.rect(surface, (40, 40, 40), (help_x, help_y, help_width, help_height))
+    pygame.draw.rect(surface, TEXT_COLOR, (help_x, help_y, help_width, help_height), 2)
+    
+    # Columns are centered as a block
+    text_x = help_x + (help_width - sum(column_widths) - 20 * (len(columns) - 1)) // 2
+    for column, column_width in zip(columns, column_widths):
+        text_y = help_y + 10
+        for text_surface in column:
+            if text_surface is None:
+                # Skip empty lines but still advance position
+                text_y += line_height // 2
             else:
-                rendered_lines.append(None)  # Placeholder for empty lines
-        
-        # Calculate left-aligned start position that centers the text block
-        text_start_x = help_x + (help_width - max_width) // 2
-        text_y = start_y
-        
-        for i, text_surface in enumerate(rendered_lines):
-            if text_y + line_height < help_y + help_height - 10:  # Check if text fits
-                if text_surface is None:
-                    # Skip empty lines but still advance position
-                    text_y += line_height // 2
-                    continue
-                else:
-                    # Use the pre-rendered surface
-                    surface.blit(text_surface, (text_start_x, text_y))
-                    text_y += line_height
+                surface.blit(text_surface, (text_x, text_y))
+                text_y += line_height
+        text_x += column_width + 20
+    return pygame.Rect(help_x, help_y, help_width, help_height)
+
+def refresh_help_box(surface):
+    """Redraw the help box on its own for its changing status lines, returns the rect to update"""
+    global help_box_rect
+    if help_box_rect is not None:
+        surface.fill(BACKGROUND_COLOR, help_box_rect)
+    rect = draw_help_box(surface)
+    dirty = rect.union(help_box_rect) if help_box_rect is not None else rect
+    help_box_rect = rect
+    return dirty
+
+def render_profile_overlay():
+    """Render the profiler's average and p95 lines into a boxed surface"""
+    help_font = text_cache.font(config_font_name, 12)
+    lines = [text_cache.render(help_font, line, (255, 255, 0) if i == 0 else TEXT_COLOR)
+             for i, line in enumerate(frame_profiler.status_lines())]
+    line_height = 15
+    box = pygame.Surface((max(line.get_width() for line in lines) + 20, len(lines) * line_height + 20))
+    box.fill((40, 40, 40))
+    pygame.draw.rect(box, TEXT_COLOR, box.get_rect(), 2)
+    for i, line in enumerate(lines):
+        box.blit(line, (10, 10 + i * line_height))
+    return box
+
+def draw_profile_overlay(surface):
+    """Draw the profiler overlay in the top right corner of the grid, returns its rect"""
+    # The help box has no room next to it, the overlay is drawn over the grid instead
+    x = max(0, GRID_SIZE_X * CELL_SIZE - profile_overlay.get_width() - 10)
+    return surface.blit(profile_overlay, (x, 10))
 
 def draw_font_popup(surface):
     global show_font_popup, font_popup_scroll
@@ -762,14 +561,14 @@ def draw_font_popup(surface):
     pygame.draw.rect(surface, TEXT_COLOR, (popup_x, popup_y, popup_width, popup_height), 2)
     
     # Title
-    title = font.render("Select Font", True, TEXT_COLOR)
+    title = text_cache.render(font, "Select Font", TEXT_COLOR)
     surface.blit(title, (popup_x + 20, popup_y + 10))
     
     # Close button
     close_rect = pygame.Rect(popup_x + popup_width - 30, popup_y + 5, 25, 25)
     pygame.draw.rect(surface, (180, 0, 0), close_rect)
     pygame.draw.rect(surface, TEXT_COLOR, close_rect, 1)
-    close_text = font.render("X", True, TEXT_COLOR)
+    close_text = text_cache.render(font, "X", TEXT_COLOR)
     close_text_rect = close_text.get_rect(center=close_rect.center)
     surface.blit(close_text, close_text_rect)
     
@@ -796,8 +595,8 @@ def draw_font_popup(surface):
     pygame.draw.rect(surface, TEXT_COLOR, scroll_up_rect, 1)
     pygame.draw.rect(surface, TEXT_COLOR, scroll_down_rect, 1)
     
-    up_text = font.render("^", True, TEXT_COLOR)
-    down_text = font.render("v", True, TEXT_COLOR)
+    up_text = text_cache.render(font, "^", TEXT_COLOR)
+    down_text = text_cache.render(font, "v", TEXT_COLOR)
     up_rect = up_text.get_rect(center=scroll_up_rect.center)
     down_rect = down_text.get_rect(center=scroll_down_rect.center)
     surface.blit(up_text, up_rect)
@@ -836,11 +635,11 @@ def draw_font_popup(surface):
         
         # Try to render in the actual font, fallback to default if failed
         try:
-            actual_font = pygame.font.SysFont(font_name, 12)
-            font_text = actual_font.render(display_name, True, TEXT_COLOR)
+            actual_font = text_cache.font(font_name, 12)
+            font_text = text_cache.render(actual_font, display_name, TEXT_COLOR)
         except:
             # Fallback to default font if the font can't be loaded
-            font_text = font.render(display_name, True, TEXT_COLOR)
+            font_text = text_cache.render(font, display_name, TEXT_COLOR)
             
         text_rect = font_text.get_rect(center=item_rect.center)
         surface.blit(font_text, text_rect)
@@ -849,7 +648,7 @@ def draw_font_popup(surface):
     
     # Instructions
     instruction_text = "Click a font to select - ESC to close"
-    instruction = font.render(instruction_text, True, (180, 180, 180))
+    instruction = text_cache.render(font, instruction_text, (180, 180, 180))
     surface.blit(instruction, (popup_x + 20, popup_y + popup_height - 30))
     
     return font_buttons, close_rect, scroll_up_rect, scroll_down_rect
@@ -873,7 +672,7 @@ def draw_config_menu(surface):
     pygame.draw.rect(surface, TEXT_COLOR, (menu_x, menu_y, menu_width, menu_height), 2)
     
     # Title
-    title = font.render("Configuration Menu", True, TEXT_COLOR)
+    title = text_cache.render(font, "Configuration Menu", TEXT_COLOR)
     surface.blit(title, (menu_x + 20, menu_y + 10))
     
     # Input fields
@@ -890,7 +689,7 @@ def draw_config_menu(surface):
         ("Grid Width:", str(config_grid_x), "grid_x"),
         ("Grid Height:", str(config_grid_y), "grid_y"),
         ("Cell Size:", str(config_cell_size), "cell_size"),
-        ("FPS:", str(config_fps), "fps")
+        ("Gen/s:", str(config_fps), "fps")
     ]
     
     buttons = []
@@ -900,7 +699,7 @@ def draw_config_menu(surface):
     
     for i, (label, value, field_id) in enumerate(fields):
         # Label
-        label_surface = font.render(label, True, TEXT_COLOR)
+        label_surface = text_cache.render(font, label, TEXT_COLOR)
         surface.blit(label_surface, (menu_x + 20, y_pos))
         
         if field_id == "font_name":
@@ -912,11 +711,11 @@ def draw_config_menu(surface):
             
             # Display current font
             display_text = config_font_name
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             # Button indicator
-            button_text = font.render("...", True, TEXT_COLOR)
+            button_text = text_cache.render(font, "...", TEXT_COLOR)
             surface.blit(button_text, (input_rect.right - 25, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -930,7 +729,7 @@ def draw_config_menu(surface):
             
             # Display current state
             display_text = "Yes" if config_font_bold else "No"
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -943,11 +742,11 @@ def draw_config_menu(surface):
             
             # Display current palette
             display_text = COLOR_PALETTES[config_palette]["name"]
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             # Cycle indicator
-            button_text = font.render("<>", True, TEXT_COLOR)
+            button_text = text_cache.render(font, "<>", TEXT_COLOR)
             surface.blit(button_text, (input_rect.right - 25, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -961,7 +760,7 @@ def draw_config_menu(surface):
             
             # Display current state
             display_text = "Yes" if config_palette_reverse else "No"
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -975,7 +774,7 @@ def draw_config_menu(surface):
             
             # Display current state
             display_text = "Yes" if config_flicker_reduction else "No"
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -987,7 +786,7 @@ def draw_config_menu(surface):
             pygame.draw.rect(surface, TEXT_COLOR, input_rect, 1)
             
             display_text = "Yes" if config_age_influence else "No"
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -1000,7 +799,7 @@ def draw_config_menu(surface):
             
             # Display current value or input text
             display_text = input_text if input_active == field_id else str(value)
-            text_surface = font.render(display_text, True, TEXT_COLOR)
+            text_surface = text_cache.render(font, display_text, TEXT_COLOR)
             surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             buttons.append((input_rect, field_id))
@@ -1027,9 +826,9 @@ def draw_config_menu(surface):
     pygame.draw.rect(surface, TEXT_COLOR, quit_rect, 1)
     
     # Button text - centered
-    apply_text = font.render("Apply", True, TEXT_COLOR)
-    cancel_text = font.render("Cancel", True, TEXT_COLOR)
-    quit_text = font.render("Quit", True, TEXT_COLOR)
+    apply_text = text_cache.render(font, "Apply", TEXT_COLOR)
+    cancel_text = text_cache.render(font, "Cancel", TEXT_COLOR)
+    quit_text = text_cache.render(font, "Quit", TEXT_COLOR)
     
     apply_text_rect = apply_text.get_rect(center=apply_rect.center)
     cancel_text_rect = cancel_text.get_rect(center=cancel_rect.center)
@@ -1057,7 +856,7 @@ def draw_config_menu(surface):
     
     for i, instruction in enumerate(instructions):
         if instruction_y + i * 15 < menu_y + menu_height - 10:  # Only show if fits
-            inst_surface = font.render(instruction, True, (180, 180, 180))
+            inst_surface = text_cache.render(font, instruction, (180, 180, 180))
             surface.blit(inst_surface, (instruction_x, instruction_y + i * 15))
     
     return buttons
@@ -1065,9 +864,9 @@ def draw_config_menu(surface):
 def handle_config_click(mouse_pos, buttons):
     global input_active, input_text, show_config, show_font_popup
     global config_font_name, config_font_size, config_grid_x, config_grid_y, config_cell_size
-    global GRID_SIZE_X, GRID_SIZE_Y, CELL_SIZE, grid
+    global GRID_SIZE_X, GRID_SIZE_Y, CELL_SIZE
     global config_font_bold, config_text, config_palette, config_palette_reverse, config_fps, config_flicker_reduction
-    global config_age_influence, config_age_resolution, BIRTH_AGE, SURVIVE_AGE
+    global config_age_influence, config_age_resolution
     
     # Check click delay to prevent rapid clicking
     if not can_click():
@@ -1089,20 +888,13 @@ def handle_config_click(mouse_pos, buttons):
                     # Update color palette
                     update_color_array()
                     
-                    # Recreate grid with new dimensions
-                    old_grid = grid.copy()
-                    grid = np.zeros((GRID_SIZE_Y, GRID_SIZE_X), dtype=int)
-                    
-                    # Copy old grid data if it fits
-                    copy_h = min(old_grid.shape[0], GRID_SIZE_Y)
-                    copy_w = min(old_grid.shape[1], GRID_SIZE_X)
-                    grid[:copy_h, :copy_w] = old_grid[:copy_h, :copy_w]
+                    # Recreate grid with new dimensions, copying old grid data if it fits
+                    sim.resize(GRID_SIZE_X, GRID_SIZE_Y)
                     
                     update_window_size()
                     
                     # Reinitialize with new font settings and text
-                    grid = initialize_grid_with_text(config_text, grid_size_x=GRID_SIZE_X, grid_size_y=GRID_SIZE_Y, 
-                                                    font_size=config_font_size, font_name=config_font_name, bold=config_font_bold)
+                    sim.initialize_grid_with_text(config_text, font_size=config_font_size, font_name=config_font_name, bold=config_font_bold)
                     
                     show_config = False
                     input_active = None
@@ -1145,6 +937,7 @@ def handle_config_click(mouse_pos, buttons):
             elif field_id == "age_influence":
                 # Toggle age influence setting
                 config_age_influence = not config_age_influence
+                sim.age_influence = config_age_influence
                 return True
             else:
                 # Start editing this field
@@ -1200,7 +993,6 @@ def handle_font_popup_click(mouse_pos, font_buttons, close_rect, scroll_up_rect,
 def handle_config_input(event):
     global input_active, input_text, show_font_popup
     global config_font_name, config_font_size, config_grid_x, config_grid_y, config_cell_size, config_text, config_fps, config_age_resolution
-    global BIRTH_AGE, SURVIVE_AGE
     
     if input_active is None:
         return False
@@ -1218,7 +1010,7 @@ def handle_config_input(event):
                 elif input_active == "cell_size":
                     config_cell_size = max(5, min(50, int(input_text)))
                 elif input_active == "fps":
-                    config_fps = max(1, min(1000, int(input_text)))  # Limit FPS between 1-1000
+                    config_fps = max(1, min(1000, int(input_text)))  # Limit between 1-1000 generations per second
                 elif input_active == "age_resolution":
                     config_age_resolution = max(1, min(20, int(input_text)))  # Limit to 1-8 bits (2-256 values)
                 elif input_active == "text":
@@ -1246,11 +1038,25 @@ def handle_config_input(event):
     return False
 
 # Load initial pattern
-grid = initialize_grid_with_text(config_text, grid_size_x=GRID_SIZE_X, grid_size_y=GRID_SIZE_Y, 
-                                font_size=config_font_size, font_name=config_font_name, bold=config_font_bold)
+sim.initialize_grid_with_text(config_text, font_size=config_font_size, font_name=config_font_name, bold=config_font_bold)
+
+# The simulation steps on its own thread, the main loop only draws its latest generation
+sim_worker = SimulationWorker(sim, config_fps)
 
-# Frame counter for simulation timing (run simulation every 4th frame)
-frame_counter = 0
+# Picks generations per frame and which frames to draw for a steady DISPLAY_FPS
+frame_scheduler = FrameScheduler(DISPLAY_FPS)
+
+# Times the phases of every frame for the profiler overlay (P) and log (L)
+frame_profiler = FrameProfiler()
+profile_overlay = None
+worker_busy = 0.0  # sim_worker.busy_seconds at the end of the last frame
+help_box_rect = None
+help_box_time = 0
+HELP_REFRESH = 0.25  # Seconds between refreshes of the help box status lines
+
+# The whole window is redrawn after input or while a menu is open, otherwise only changed cells
+redraw_all = True
+shown_grid = None  # Grid on the display, compared before blocking while paused
 
 #TODO # Set initial window size
 update_window_size()
@@ -1261,48 +1067,98 @@ while True:
     mouse_pos = None
     mouse_left_pressed = False
     mouse_right_pressed = False
-    
-    for event in pygame.event.get():
+
+    events = pygame.event.get()
+    if (not events and not running and not any(pygame.mouse.get_pressed())
+            and sim_worker.settled()[0] is shown_grid):
+        # Paused, idle and the last generation is on the display, sleep until the next input
+        frame_profiler.lap("events")
+        events = [pygame.event.wait()] + pygame.event.get()
+        frame_profiler.lap("wait")
+    if events:
+        redraw_all = True
+
+    for event in events:
         if event.type == pygame.QUIT:
+            sim_worker.stop()
+            frame_profiler.close_log()
             pygame.quit()
             exit()
 
-        # Handle config menu input first
-        if show_config and handle_config_input(event):
-            continue
+        # Everything below may change the simulator, so the worker must not step meanwhile
+        with sim_worker.edit():
+            # Handle config menu input first
+            if show_config and handle_config_input(event):
+                continue
 
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                if show_font_popup:
-                    show_font_popup = False
-                elif show_config:
-                    show_config = False
-                    input_active = None
-                else:
-                    show_config = True
-            elif event.key == pygame.K_SPACE:
-                running = not running
-            elif event.key == pygame.K_c:
-                grid.fill(0)
-            elif event.key == pygame.K_h:
-                grid = initialize_grid_with_text(config_text, grid_size_x=GRID_SIZE_X, grid_size_y=GRID_SIZE_Y, 
-                                                font_size=config_font_size, font_name=config_font_name, bold=config_font_bold)
-            elif event.key == pygame.K_r:
-                randomize_rules()
-            elif pygame.K_0 <= event.key <= pygame.K_9:
-                preset = event.key - pygame.K_0
-                if config_age_influence:
-                    # Handle age rules for presets
-                    if preset < len(AGE_RULE_PRESETS):
-                        BIRTH, SURVIVE, BIRTH_AGE, SURVIVE_AGE = AGE_RULE_PRESETS[preset]
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    if show_font_popup:
+                        show_font_popup = False
+                    elif show_config:
+                        show_config = False
+                        input_active = None
+                    else:
+                        show_config = True
+                elif event.key == pygame.K_SPACE:
+                    running = not running
+                elif event.key == pygame.K_c:
+                    sim.grid.fill(0)
+                    sim.mark_edited()
+                elif event.key == pygame.K_h:
+                    sim.initialize_grid_with_text(config_text, font_size=config_font_size, font_name=config_font_name, bold=config_font_bold)
+                elif event.key == pygame.K_r:
+                    randomize_rules()
+                elif event.key == pygame.K_f:
+                    config_max_speed = not config_max_speed
+                elif event.key == pygame.K_p:
+                    config_profile_overlay = not config_profile_overlay
+                    profile_overlay = render_profile_overlay()
+                elif event.key == pygame.K_l:
+                    if frame_profiler.log_path is None:
+                        frame_profiler.open_log(time.strftime("profile_%Y%m%d_%H%M%S") + PROFILE_LOG_EXTENSION)
+                        print(f"[INFO] Logging frame timings to {frame_profiler.log_path}")
+                    else:
+                        print(f"[INFO] Frame timings saved to {frame_profiler.close_log()}")
+                elif event.key == pygame.K_s:
+                    pattern_path = time.strftime("pattern_%Y%m%d_%H%M%S.rle")
+                    sim.save_pattern(pattern_path)
+                    print(f"[INFO] Pattern saved to {pattern_path}")
+                elif event.key == pygame.K_w:
+                    if sim_worker.recorder is None:
+                        sim_worker.start_recording(time.strftime("recording_%Y%m%d_%H%M%S.golrec"))
+                    else:
+                        sim_worker.stop_recording()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    config_fps = min(1000, config_fps * 2)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    config_fps = max(1, config_fps // 2)
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    preset = event.key - pygame.K_0
+                    if config_age_influence:
+                        # Handle age rules for presets
+                        if preset < len(AGE_RULE_PRESETS):
+                            sim.apply_preset(preset)
+                            update_color_array(False)
+                    else:
+                        if preset < len(RULE_PRESETS):
+                            # Also resets age rules to full range 1-15
+                            sim.apply_preset(preset)
+                            update_color_array(False) # Update colors to handle BIRTH 0 rule is/was active
+
+            elif event.type == pygame.DROPFILE:
+                # Dropping a .rle or .cells file onto the window loads it, with the rule from an RLE header.
+                # Images are scaled down to the grid, their gray levels become ages
+                try:
+                    if event.file.lower().endswith(IMAGE_EXTENSIONS):
+                        sim.initialize_grid_with_image(event.file, fit=True)
+                        print(f"[INFO] Loaded image {event.file}")
+                    else:
+                        sim.load_pattern(event.file)
                         update_color_array(False)
-                else:
-                    if preset < len(RULE_PRESETS):
-                        BIRTH, SURVIVE = map(set, RULE_PRESETS[preset])
-                        # Reset age rules to full range when switching rule presets
-                        BIRTH_AGE = set(range(1, 16))  # Reset to 1-15
-                        SURVIVE_AGE = set(range(1, 16))  # Reset to 1-15
-                        update_color_array(False) # Update colors to handle BIRTH 0 rule is/was active
+                        print(f"[INFO] Loaded pattern {event.file}")
+                except (OSError, ValueError) as e:
+                    print(f"[ERROR] Could not load {event.file}: {e}")
     
     # Check for mouse events
     if pygame.mouse.get_pressed()[0]:
@@ -1312,15 +1168,51 @@ while True:
         mouse_right_pressed = True
         mouse_pos = pygame.mouse.get_pos()
 
-    if running and not show_config and not show_font_popup:
-        # Only update simulation every 4th frame
-        if frame_counter % 4 == 0:
-            grid = update_grid(grid)
-    
-    # Increment frame counter
-    frame_counter += 1
+    # In max speed mode the worker is limited to the generations that fit next to drawing
+    sim_worker.set_speed(frame_scheduler.plan(sim_worker.step_seconds, config_fps, config_max_speed))
+    sim_worker.set_running(running and not show_config and not show_font_popup)
+
+    # Latest complete generation from the worker
+    grid, generation = sim_worker.latest()
+    frame_profiler.lap("events")
+    # The worker steps on its own thread, its stepping time since the last frame
+    busy = sim_worker.busy_seconds
+    frame_profiler.add("update_grid", busy - worker_busy)
+    worker_busy = busy
 
+    if not (redraw_all or show_config or show_font_popup or mouse_left_pressed or mouse_right_pressed):
+        # Only the grid can have changed, push just its dirty rects to the display
+        drawn = frame_scheduler.should_draw()
+        if drawn:
+            draw_start = time.perf_counter()
+            dirty_rects = draw_grid_changes(screen, grid)
+            shown_grid = grid
+            frame_profiler.lap("draw_grid")
+            if draw_start - help_box_time >= HELP_REFRESH:
+                help_box_time = draw_start
+                dirty_rects.append(refresh_help_box(screen))
+                if config_profile_overlay:
+                    profile_overlay = render_profile_overlay()
+            if config_profile_overlay:
+                # Changed cells below the overlay were just drawn over it
+                dirty_rects.append(draw_profile_overlay(screen))
+            frame_profiler.lap("ui")
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            frame_profiler.lap("flip")
+            frame_scheduler.record_draw(time.perf_counter() - draw_start)
+        frame_scheduler.frame_done(generation, drawn)
+        frame_profiler.skip()
+        clock.tick(DISPLAY_FPS)
+        frame_profiler.lap("wait")
+        frame_profiler.frame_done()
+        continue
+    redraw_all = False
+
+    draw_start = time.perf_counter()
     draw_grid(screen, grid)
+    shown_grid = grid
+    frame_profiler.lap("draw_grid")
     
     # Initialize button variables
     birth_buttons = []
@@ -1341,11 +1233,12 @@ while True:
         
         # Handle config menu clicks
         if mouse_left_pressed:
-            handle_config_click(mouse_pos, config_buttons)
+            with sim_worker.edit():
+                handle_config_click(mouse_pos, config_buttons)
             
     else:
-        birth_buttons = draw_rule_buttons(screen, BIRTH, "BIRTH", RULE_Y_OFFSET)
-        survive_buttons = draw_rule_buttons(screen, SURVIVE, "SURVIVE", RULE_Y_OFFSET + RULE_BUTTON_HEIGHT + 10)
+        birth_buttons = draw_rule_buttons(screen, sim.birth, "BIRTH", RULE_Y_OFFSET)
+        survive_buttons = draw_rule_buttons(screen, sim.survive, "SURVIVE", RULE_Y_OFFSET + RULE_BUTTON_HEIGHT + 10)
         
         # Draw age rule buttons if age influence is enabled
         if config_age_influence:
@@ -1373,9 +1266,9 @@ while True:
             if horizontal_fits_width and horizontal_fits_height:
                 # Horizontal layout at the bottom
                 age_y_start = RULE_Y_OFFSET + RULE_BUTTON_HEIGHT * 2 + 40
-                birth_age_buttons = draw_age_rule_buttons(screen, BIRTH_AGE, "BIRTH AGE", 
+                birth_age_buttons = draw_age_rule_buttons(screen, sim.birth_age, "BIRTH AGE", 
                                                         0, age_y_start, vertical=False)
-                survive_age_buttons = draw_age_rule_buttons(screen, SURVIVE_AGE, "SURVIVE AGE", 
+                survive_age_buttons = draw_age_rule_buttons(screen, sim.survive_age, "SURVIVE AGE", 
                                                           0, age_y_start + age_button_height + 30, vertical=False)
             else:
                 # Vertical layout on the right side
@@ -1384,33 +1277,49 @@ while True:
                 age_buttons_height = 8 * (age_button_height + RULE_MARGIN)
                 survive_age_y_offset = birth_age_y_offset + age_buttons_height + 40
                 
-                birth_age_buttons = draw_age_rule_buttons(screen, BIRTH_AGE, "BIRTH AGE", 
+                birth_age_buttons = draw_age_rule_buttons(screen, sim.birth_age, "BIRTH AGE", 
                                                         age_x_offset, birth_age_y_offset, vertical=True)
-                survive_age_buttons = draw_age_rule_buttons(screen, SURVIVE_AGE, "SURVIVE AGE", 
+                survive_age_buttons = draw_age_rule_buttons(screen, sim.survive_age, "SURVIVE AGE", 
                                                           age_x_offset, survive_age_y_offset, vertical=True)
         
-        draw_help_box(screen)  # Draw help box to the right of rule buttons
+        help_box_rect = draw_help_box(screen)  # Draw help box to the right of rule buttons
+        help_box_time = draw_start
+        if config_profile_overlay:
+            profile_overlay = render_profile_overlay()
+            draw_profile_overlay(screen)
+        frame_profiler.lap("ui")
         
         # Handle mouse clicks on game area and rule buttons
-        if mouse_left_pressed:
-            mx, my = mouse_pos
-            x, y = mx // CELL_SIZE, my // CELL_SIZE
-            # Only modify grid if click is within the actual grid bounds
-            if 0 <= x < GRID_SIZE_X and 0 <= y < GRID_SIZE_Y:
-                grid[y][x] = 1
-            else:
-                # Click is outside grid area, check for rule button clicks
-                if config_age_influence:
-                    handle_rule_click(mouse_pos, birth_buttons, survive_buttons, birth_age_buttons, survive_age_buttons)
+        with sim_worker.edit():
+            if mouse_left_pressed:
+                mx, my = mouse_pos
+                x, y = mx // CELL_SIZE, my // CELL_SIZE
+                # Only modify grid if click is within the actual grid bounds
+                if 0 <= x < GRID_SIZE_X and 0 <= y < GRID_SIZE_Y:
+                    sim.grid[y][x] = 1
+                    sim.mark_edited()
                 else:
-                    handle_rule_click(mouse_pos, birth_buttons, survive_buttons)
+                    # Click is outside grid area, check for rule button clicks
+                    if config_age_influence:
+                        handle_rule_click(mouse_pos, birth_buttons, survive_buttons, birth_age_buttons, survive_age_buttons)
+                    else:
+                        handle_rule_click(mouse_pos, birth_buttons, survive_buttons)
 
-        elif mouse_right_pressed:
-            mx, my = mouse_pos
-            x, y = mx // CELL_SIZE, my // CELL_SIZE
-            # Only modify grid if click is within the actual grid bounds
-            if 0 <= x < GRID_SIZE_X and 0 <= y < GRID_SIZE_Y:
-                grid[y][x] = 0
+            elif mouse_right_pressed:
+                mx, my = mouse_pos
+                x, y = mx // CELL_SIZE, my // CELL_SIZE
+                # Only modify grid if click is within the actual grid bounds
+                if 0 <= x < GRID_SIZE_X and 0 <= y < GRID_SIZE_Y:
+                    sim.grid[y][x] = 0
+                    sim.mark_edited()
+        frame_profiler.lap("events")
+    frame_profiler.lap("ui")
     
     pygame.display.flip()
-    clock.tick(config_fps * 4)  # Run display at 4x config_fps, simulation runs every 4th frame
+    frame_profiler.lap("flip")
+    frame_scheduler.record_draw(time.perf_counter() - draw_start)
+    frame_scheduler.frame_done(generation, True)
+    frame_profiler.skip()
+    clock.tick(DISPLAY_FPS)
+    frame_profiler.lap("wait")
+    frame_profiler.frame_done()
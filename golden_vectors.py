@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from headless import add_simulation_arguments, setup_simulator
+from simulator import format_rule
+
+# Golden vectors for the HDL testbenches.
+# Runs a rule and seed for N generations and writes every generation as a
+# packed memory image: ages are config_age_resolution bits wide, packed LSB
+# first into words of --word-bits (cells do not straddle words), every row
+# starts a new word. The default output is one $readmemh .mem file per
+# generation, --binary writes little-endian raw words (.bin) instead.
+# vectors.json describes the layout and the rule. Example:
+#   python golden_vectors.py vectors/ -n 1000 --text HeiChips --preset 3 --age-resolution 4
+
+WORD_BITS = 32
+WRITE_BUFFER = 1024 * 1024
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+def pack_words(grid, bits, word_bits=WORD_BITS):
+    """Pack the ages of grid into words, word_bits // bits cells per word, rows padded to whole words"""
+    cells_per_word = word_bits // bits
+    if cells_per_word < 1:
+        raise ValueError(f"{bits} bit ages do not fit in {word_bits} bit words")
+    h, w = grid.shape
+    words_per_row = -(-w // cells_per_word)
+    cells = np.zeros((h, words_per_row * cells_per_word), dtype=np.uint64)
+    cells[:, :w] = grid
+    cells &= np.uint64((1 << bits) - 1)
+    shifts = np.arange(cells_per_word, dtype=np.uint64) * np.uint64(bits)
+    return np.bitwise_or.reduce(cells.reshape(h, words_per_row, cells_per_word) << shifts, axis=2).ravel()
+
+def hex_lines(words, word_bits=WORD_BITS):
+    """$readmemh text of the words, one zero-padded hex word per line"""
+    digits = -(-word_bits // 4)
+    shifts = np.arange(digits - 1, -1, -1, dtype=np.uint64) * np.uint64(4)
+    text = np.empty((len(words), digits + 1), dtype=np.uint8)
+    text[:, :digits] = HEX_DIGITS[(words[:, None] >> shifts) & np.uint64(0xF)]
+    text[:, digits] = ord("\n")
+    return text.tobytes()
+
+def write_vector(path, words, word_bits=WORD_BITS, binary=False, comment=None):
+    """Write one memory image, as $readmemh text or raw little-endian words"""
+    with open(path, "wb", buffering=WRITE_BUFFER) as f:
+        if binary:
+            f.write(words.astype(f"<u{word_bits // 8}").tobytes())
+        else:
+            if comment:
+                f.write(f"// {comment}\n".encode())
+            f.write(hex_lines(words, word_bits))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write golden vectors ($readmemh .mem files) of a simulation run")
+    parser.add_argument("directory", help="output directory, gets gen_000000.mem ... and vectors.json")
+    parser.add_argument("-n", "--generations", type=int, default=100, help="number of generations after the seed")
+    add_simulation_arguments(parser)
+    parser.add_argument("--word-bits", type=int, default=WORD_BITS, choices=(8, 16, 32, 64), help="memory word width")
+    parser.add_argument("--binary", action="store_true", help="write raw little-endian words (.bin) instead of hex text")
+    args = parser.parse_args(argv)
+
+    sim = setup_simulator(args)
+    bits = sim.age_limit.bit_length()
+    if bits > args.word_bits:
+        raise SystemExit(f"[ERROR] {bits} bit ages do not fit in {args.word_bits} bit words")
+    os.makedirs(args.directory, exist_ok=True)
+
+    height, width = sim.grid.shape
+    cells_per_word = args.word_bits // bits
+    manifest = {
+        "rule": format_rule(sim.birth, sim.survive),
+        "age_influence": sim.age_influence,
+        "birth_age": sorted(sim.birth_age) if sim.age_influence else None,
+        "survive_age": sorted(sim.survive_age) if sim.age_influence else None,
+        "width": width,
+        "height": height,
+        "age_bits": bits,
+        "word_bits": args.word_bits,
+        "cells_per_word": cells_per_word,
+        "words_per_row": -(-width // cells_per_word),
+        "generations": args.generations + 1,
+        "format": "binary" if args.binary else "readmemh",
+    }
+    extension = ".bin" if args.binary else ".mem"
+
+    start = time.perf_counter()
+    grid = sim.grid
+    for generation in range(args.generations + 1):
+        if generation:
+            grid = sim.update_grid()
+        write_vector(os.path.join(args.directory, f"gen_{generation:06d}{extension}"),
+                     pack_words(grid, bits, args.word_bits), args.word_bits, args.binary,
+                     f"generation {generation}, {width}x{height}, {bits} bit ages, {cells_per_word} cells per word")
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(args.directory, "vectors.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"[INFO] Wrote {args.generations + 1} {manifest['format']} vectors ({manifest['words_per_row'] * height} "
+          f"words of {args.word_bits} bits) to {args.directory} in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
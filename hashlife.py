@@ -0,0 +1,270 @@
+import time
+import numpy as np
+from engine import step_grid
+
+# HashLife (memoized quadtree) engine for plain BIRTH/SURVIVE rules.
+# The grid is embedded in a quadtree whose area outside the grid is filled with
+# WALL cells: they count as dead neighbors and never change, which gives the
+# same bounded (dead-edge) universe as update_grid, even for B0 rules.
+# Nodes are hash-consed so identical regions share one node and one cached
+# result. Only liveness is tracked, see fast_forward() for ages.
+# The node table is checked while results are computed: above max_nodes every
+# cached result and every node not reachable from the root or the uniform
+# nodes is dropped. Nodes still in use by the running computation stay alive
+# and only lose their sharing. The next collection waits until the table has
+# doubled, so a root that alone exceeds max_nodes does not collect every step.
+
+DEAD, ALIVE, WALL = 0, 1, 2
+MAX_NODES = 1_000_000  # Node table size that triggers eviction
+
+class Node:
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population', 'state')
+
+    def __init__(self, level, nw=None, ne=None, sw=None, se=None, population=0, state=None):
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+        self.state = state
+
+class HashLife:
+    """Quadtree universe that can jump ahead 2^k generations at a time"""
+
+    def __init__(self, grid, birth, survive, max_nodes=MAX_NODES):
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        self.height, self.width = grid.shape
+        self.max_nodes = max_nodes
+        self.collect_at = max_nodes
+        self.generation = 0
+
+        self.leaves = [Node(0, state=s, population=int(s == ALIVE)) for s in (DEAD, ALIVE, WALL)]
+        self.table = {}
+        self.results = {}
+        self.uniform_nodes = {state: [self.leaves[state]] for state in (DEAD, WALL)}
+
+        self.root, self.origin = self.build(grid > 0)
+
+    def join(self, nw, ne, sw, se):
+        """Return the canonical node with the given quadrants"""
+        key = (id(nw), id(ne), id(sw), id(se))
+        node = self.table.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw.level + 1, nw, ne, sw, se, population)
+            self.table[key] = node
+        return node
+
+    def uniform(self, state, level):
+        """Return the node of the given level filled with a single state"""
+        nodes = self.uniform_nodes[state]
+        while len(nodes) <= level:
+            n = nodes[-1]
+            nodes.append(self.join(n, n, n, n))
+        return nodes[level]
+
+    def build(self, alive):
+        """Build the root node from a boolean grid, returns the root and the grid origin in it"""
+        level = max(2, int(np.ceil(np.log2(max(self.height, self.width)))))
+        size = 1 << level
+        states = np.full((size, size), WALL, dtype=np.uint8)
+        states[:self.height, :self.width] = alive
+
+        def build_node(y, x, level):
+            if level == 0:
+                return self.leaves[states[y, x]]
+            block = states[y:y + (1 << level), x:x + (1 << level)]
+            lowest, highest = block.min(), block.max()
+            if lowest == highest and lowest != ALIVE:
+                return self.uniform(int(lowest), level)
+            half = 1 << (level - 1)
+            return self.join(build_node(y, x, level - 1), build_node(y, x + half, level - 1),
+                             build_node(y + half, x, level - 1), build_node(y + half, x + half, level - 1))
+
+        return build_node(0, 0, level), 0
+
+    def centre(self, node):
+        """Return the central half of a node (one level lower)"""
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def expand(self, node):
+        """Return a node one level higher with the given node in its centre, surrounded by walls"""
+        w = self.uniform(WALL, node.level - 1)
+        return self.join(self.join(w, w, w, node.nw), self.join(w, w, node.ne, w),
+                         self.join(w, node.sw, w, w), self.join(node.se, w, w, w))
+
+    def step_base(self, node):
+        """Advance the centre 2x2 of a 4x4 node by one generation"""
+        cells = [[None] * 4 for _ in range(4)]
+        for qy, qx, quad in ((0, 0, node.nw), (0, 2, node.ne), (2, 0, node.sw), (2, 2, node.se)):
+            for sy, sx, leaf in ((0, 0, quad.nw), (0, 1, quad.ne), (1, 0, quad.sw), (1, 1, quad.se)):
+                cells[qy + sy][qx + sx] = leaf.state
+
+        result = []
+        for y in (1, 2):
+            for x in (1, 2):
+                state = cells[y][x]
+                if state == WALL:
+                    result.append(self.leaves[WALL])
+                    continue
+                neighbors = sum(cells[y + dy][x + dx] == ALIVE
+                                for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx)
+                rule = self.survive if state == ALIVE else self.birth
+                result.append(self.leaves[ALIVE if neighbors in rule else DEAD])
+        return self.join(*result)
+
+    def successor(self, node, j):
+        """Return the centre of a node (one level lower) advanced by 2^j generations, j <= level - 2"""
+        j = min(j, node.level - 2)
+        key = (id(node), j)
+        cached = self.results.get(key)
+        if cached is not None:
+            return cached[1]
+
+        if node.population == 0 and 0 not in self.birth:
+            # Nothing alive and nothing can be born, the area stays as it is
+            result = self.centre(node)
+        elif node.level == 2:
+            result = self.step_base(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            c1 = self.successor(nw, j)
+            c2 = self.successor(self.join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self.successor(ne, j)
+            c4 = self.successor(self.join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self.successor(self.centre(node), j)
+            c6 = self.successor(self.join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self.successor(sw, j)
+            c8 = self.successor(self.join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self.successor(se, j)
+
+            if j < node.level - 2:
+                # The first half already advanced 2^j generations, only recentre
+                result = self.join(self.join(c1.se, c2.sw, c4.ne, c5.nw),
+                                   self.join(c2.se, c3.sw, c5.ne, c6.nw),
+                                   self.join(c4.se, c5.sw, c7.ne, c8.nw),
+                                   self.join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                result = self.join(self.successor(self.join(c1, c2, c4, c5), j),
+                                   self.successor(self.join(c2, c3, c5, c6), j),
+                                   self.successor(self.join(c4, c5, c7, c8), j),
+                                   self.successor(self.join(c5, c6, c8, c9), j))
+
+        # The entry keeps the node alive, so its id is not reused while the result is cached
+        self.results[key] = (node, result)
+        if len(self.table) > self.collect_at:
+            self.collect()
+        return result
+
+    def jump(self, k):
+        """Advance exactly 2^k generations"""
+        # The grid has to sit in the central half and the root needs level >= k + 2
+        root = self.expand(self.root)
+        origin = self.origin + (1 << (root.level - 2))
+        while root.level < k + 2:
+            origin += 1 << (root.level - 1)
+            root = self.expand(root)
+
+        self.root = self.successor(root, k)
+        self.origin = origin - (1 << (root.level - 2))
+        self.generation += 1 << k
+        self.shrink()
+        self.collect()
+
+    def shrink(self):
+        """Drop wall-only borders from the root after large jumps"""
+        while self.root.level > 2:
+            quarter = 1 << (self.root.level - 2)
+            if self.origin < quarter or self.origin + max(self.height, self.width) > 3 * quarter:
+                break
+            self.root = self.centre(self.root)
+            self.origin -= quarter
+
+    def collect(self):
+        """Evict cached nodes and results when the node table exceeds max_nodes"""
+        if len(self.table) <= self.collect_at:
+            return
+        self.results = {}
+        self.table = {}
+        stack = [self.root] + [n for nodes in self.uniform_nodes.values() for n in nodes]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (id(node.nw), id(node.ne), id(node.sw), id(node.se))
+            if key not in self.table:
+                self.table[key] = node
+                stack.extend((node.nw, node.ne, node.sw, node.se))
+        self.collect_at = max(self.max_nodes, 2 * len(self.table))
+
+    def step(self, generations):
+        """Advance the given number of generations using power-of-two jumps"""
+        for k in range(generations.bit_length()):
+            if (generations >> k) & 1:
+                self.jump(k)
+
+    def advance_to(self, generation):
+        """Advance to an absolute generation number"""
+        if generation < self.generation:
+            raise ValueError(f"Cannot go back from generation {self.generation} to {generation}")
+        self.step(generation - self.generation)
+
+    def alive(self):
+        """Return the liveness plane of the grid as a 2D boolean array"""
+        out = np.zeros((self.height, self.width), dtype=bool)
+        stack = [(self.root, -self.origin, -self.origin)]
+        while stack:
+            node, y, x = stack.pop()
+            size = 1 << node.level
+            if node.population == 0 or y >= self.height or x >= self.width or y + size <= 0 or x + size <= 0:
+                continue
+            if node.level == 0:
+                out[y, x] = True
+                continue
+            half = size >> 1
+            stack.extend(((node.nw, y, x), (node.ne, y, x + half),
+                          (node.sw, y + half, x), (node.se, y + half, x + half)))
+        return out
+
+    def population(self):
+        """Number of live cells"""
+        return self.root.population
+
+def fast_forward(grid, birth, survive, generations, age_limit):
+    """Return the age grid after the given number of generations, same result as repeated step_grid calls"""
+    # Ages saturate at age_limit, so only the last age_limit generations decide them:
+    # jump ahead with HashLife, then step the remaining generations with ages
+    if generations > age_limit:
+        life = HashLife(grid, birth, survive)
+        life.step(generations - age_limit)
+        grid = life.alive().astype(grid.dtype)
+        generations = age_limit
+    for _ in range(generations):
+        grid = step_grid(grid, birth, survive, age_limit)
+    return grid
+
+def jump_ahead(grid, birth, survive, generations, age_limit, step_seconds, allowance):
+    """Like fast_forward, but gives up jumping when HashLife does not pay off against stepping
+
+    Jumping stops once its total time exceeds step_seconds per jumped generation
+    plus allowance generations. Returns the age grid and the number of
+    generations it advanced (at least age_limit + 1)."""
+    # Early jumps build the node cache and are slower than stepping, for
+    # patterns with repeating regions the later ones are almost free. Chaotic
+    # rules share hardly any nodes and stay 25x slower, they use up the allowance.
+    # Jumps double in size, the last age_limit generations are stepped for the ages
+    life = HashLife(grid, birth, survive)
+    target = generations - age_limit
+    spent = 0.0
+    k = 0
+    while life.generation < target:
+        k = min(k, (target - life.generation).bit_length() - 1)
+        start = time.perf_counter()
+        life.jump(k)
+        spent += time.perf_counter() - start
+        if spent > (life.generation + allowance) * step_seconds:
+            break
+        k += 1
+    grid = life.alive().astype(grid.dtype)
+    for _ in range(age_limit):
+        grid = step_grid(grid, birth, survive, age_limit)
+    return grid, life.generation + age_limit
@@ -0,0 +1,148 @@
+import time
+START_TIME = time.perf_counter()
+
+import argparse
+import atexit
+import json
+import numpy as np
+from simulator import Simulator, RULE_PRESETS, AGE_RULE_PRESETS, parse_rule, format_rule
+from recorder import Recorder, KEYFRAME_INTERVAL
+from parallel import BandedStepper, PARALLEL_MIN_CELLS
+from bitboard import BitBoardStepper
+from active_region import ActiveRegionStepper
+
+# Headless runner: steps the simulator at full speed without pygame and writes
+# the final grid (.npy) and the timing. Example:
+#   python headless.py -n 1000 --rule B3/S23 --width 600 --height 600 --output final.npy
+
+def add_simulation_arguments(parser):
+    """Grid size, rule and seed options, shared with the exporters"""
+    parser.add_argument("--width", type=int, default=64, help="grid width in cells")
+    parser.add_argument("--height", type=int, default=48, help="grid height in cells")
+    rules = parser.add_mutually_exclusive_group()
+    rules.add_argument("--preset", type=int, help="rule preset index (0-9)")
+    rules.add_argument("--rule", help="rule string like B3/S23")
+    parser.add_argument("--age-influence", action="store_true", help="use age-filtered neighbor counts")
+    parser.add_argument("--age-resolution", type=int, default=4, help="number of age bits (1-20)")
+    parser.add_argument("--text", help="seed the grid with text instead of random cells")
+    parser.add_argument("--image", help="seed the grid with an image (scaled down to fit), its gray levels become ages")
+    parser.add_argument("--pattern", help="seed the grid with a .rle or .cells pattern, its rule applies unless --rule/--preset is given")
+    parser.add_argument("--font", default=None, help="system font name for --text")
+    parser.add_argument("--font-size", type=int, default=15, help="font size for --text")
+    parser.add_argument("--bold", action="store_true", help="bold font for --text")
+    parser.add_argument("--glyph-atlas", help="glyph atlas (path without .npy/.json) for --text, see glyph_atlas.py")
+    parser.add_argument("--density", type=float, default=0.3, help="live cell density of the random seed")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"step grids of at least {PARALLEL_MIN_CELLS} cells in bands on this many processes")
+    parser.add_argument("--bitboard", action="store_true", help="step plain rules on the bit-packed engine")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the Bag O' Life simulator without a display")
+    parser.add_argument("-n", "--generations", type=int, default=1000, help="number of generations to run")
+    add_simulation_arguments(parser)
+    parser.add_argument("--output", help="write the final grid to this .npy file")
+    parser.add_argument("--timing", help="write the timing as JSON to this file")
+    parser.add_argument("--save-pattern", help="write the final grid to this .rle or .cells file")
+    parser.add_argument("--record", help="record every generation to this .golrec file")
+    parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL, help="records between keyframes of --record")
+    return parser
+
+def setup_simulator(args):
+    """Simulator with the rules and seed grid from the parsed arguments"""
+    if args.bitboard and (args.age_influence or args.workers > 1):
+        raise SystemExit("[ERROR] --bitboard steps plain rules in one process, without --age-influence or --workers")
+    sim = Simulator(args.width, args.height, max(1, min(20, args.age_resolution)), args.age_influence)
+    if args.bitboard:
+        sim.stepper = BitBoardStepper()
+    elif args.workers > 1:
+        sim.stepper = BandedStepper(args.workers)
+        atexit.register(sim.stepper.close)
+    if args.pattern:
+        try:
+            sim.load_pattern(args.pattern)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"[ERROR] Could not load {args.pattern}: {e}")
+
+    if args.preset is not None:
+        presets = AGE_RULE_PRESETS if args.age_influence else RULE_PRESETS
+        if not 0 <= args.preset < len(presets):
+            raise SystemExit(f"[ERROR] Preset must be 0-{len(presets) - 1}")
+        sim.apply_preset(args.preset)
+    elif args.rule:
+        try:
+            sim.birth, sim.survive = parse_rule(args.rule)
+        except ValueError as e:
+            raise SystemExit(f"[ERROR] {e}")
+
+    if args.glyph_atlas:
+        try:
+            sim.load_glyph_atlas(args.glyph_atlas)
+        except (OSError, ValueError, KeyError) as e:
+            raise SystemExit(f"[ERROR] Could not load glyph atlas {args.glyph_atlas}: {e}")
+    if args.text:
+        sim.initialize_grid_with_text(args.text, font_size=args.font_size, font_name=args.font, bold=args.bold)
+    elif args.image:
+        try:
+            sim.initialize_grid_with_image(args.image, fit=True)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"[ERROR] Could not load {args.image}: {e}")
+    elif not args.pattern:
+        rng = np.random.default_rng(args.seed)
+        sim.grid[:] = rng.random(sim.grid.shape) < args.density
+    return sim
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sim = setup_simulator(args)
+
+    setup_done = time.perf_counter()
+    if args.record:
+        # Every generation is stepped and written, periodic runs are not skipped
+        with Recorder(args.record, sim.grid.shape, sim.grid.dtype, max(1, args.keyframe_interval)) as recorder:
+            recorder.write(sim.grid, sim.generation)
+            for _ in range(args.generations):
+                recorder.write(sim.update_grid(), sim.generation)
+    else:
+        sim.run(args.generations)
+    run_time = time.perf_counter() - setup_done
+
+    timing = {
+        "rule": format_rule(sim.birth, sim.survive),
+        "age_influence": args.age_influence,
+        "width": args.width,
+        "height": args.height,
+        "generations": args.generations,
+        "workers": args.workers,
+        "bitboard": args.bitboard,
+        "startup_seconds": setup_done - START_TIME,
+        "run_seconds": run_time,
+        "generations_per_second": args.generations / run_time if run_time > 0 else None,
+        "population": int(np.count_nonzero(sim.grid)),
+        "period": sim.cycles.period,
+        "transient": sim.cycles.transient,
+    }
+    if isinstance(sim.stepper, ActiveRegionStepper):
+        # Tiles summed over all stepped generations (generations answered from a cycle step no tiles)
+        timing["skipped_tiles"] = sim.stepper.skipped_tiles_total
+        timing["total_tiles"] = sim.stepper.stepped_tiles_total
+
+    if args.output:
+        np.save(args.output, sim.grid)
+    if args.save_pattern:
+        sim.save_pattern(args.save_pattern)
+    if args.timing:
+        with open(args.timing, "w") as f:
+            json.dump(timing, f, indent=2)
+
+    print(f"[INFO] {timing['rule']} {args.width}x{args.height}: {args.generations} generations in "
+          f"{run_time:.3f}s, startup {timing['startup_seconds'] * 1000:.0f}ms, population {timing['population']}")
+    if "skipped_tiles" in timing and timing["total_tiles"]:
+        print(f"[INFO] Active regions skipped {timing['skipped_tiles']} of {timing['total_tiles']} tiles "
+              f"({timing['skipped_tiles'] / timing['total_tiles']:.0%})")
+    if sim.cycles.period is not None:
+        print(f"[INFO] Periodic with period {sim.cycles.period} from generation {sim.cycles.transient}")
+    return timing
+
+if __name__ == "__main__":
+    main()
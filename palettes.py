@@ -0,0 +1,162 @@
+import numpy as np
+
+# Age color palettes, shared by the pygame app and the headless exporters.
+# palette_colors() builds COLOR_ARRAY (colors for ages 1..AGE_LIMIT) and
+# palette_lut() turns it into a lookup table indexed by age.
+
+DEFAULT_DEAD_COLOR = (30, 30, 30)
+
+def color_gradient(start_color, end_color, steps):
+    gradient = []
+    for i in range(steps):
+        r = int(start_color[0] + (end_color[0] - start_color[0]) * i / (steps - 1))
+        g = int(start_color[1] + (end_color[1] - start_color[1]) * i / (steps - 1))
+        b = int(start_color[2] + (end_color[2] - start_color[2]) * i / (steps - 1))
+        gradient.append((r, g, b))
+    return gradient
+
+def hex_to_rgb(hex):
+  return tuple(int(hex[i:i+2], 16) for i in (0, 2, 4))
+
+# Color palettes
+COLOR_PALETTES = {
+    0: {
+        "name": "Rainbow",
+        "colors": [
+            'FF0000', # Red
+            'FF4000', # Red-Orange
+            'FF8000', # Orange
+            'FFBF00', # Yellow-Orange
+            'FFFF00', # Yellow
+            'BFFF00', # Yellow-Green
+            '80FF00', # Green-Yellow
+            '40FF00', # Yellowish Green
+            '00FF00', # Green
+            '00FF80', # Green-Cyan
+            '00FFBF', # Cyan-Green
+            '00FFFF', # Cyan
+            '0080FF', # Blue-Cyan
+            '0000FF', # Blue
+            '4B0082', # Indigo
+            '8F00FF', # Violet
+        ]
+    },
+    1: {
+        "name": "Game Boy",
+        "colors": ['9BBC0F', '332c50', '332c50', '8BAC0F', '306230', '0F380F', '0F380F', '2D5A2D', '4F7F4F', '8BAC0F', '9BBC0F', 'ADCFAD', 'e0dbcd', 'a89f94', '706b66', '2b2b26']
+    },
+    2: {
+        "name": "Fire",
+        "colors": ['FFBA08', '03073E', '370617', '6A040F', '9D0208', 'D00000', 'DC2F02', 'E85D04', 'F48C06', 'FAA307', 'FFBA08']
+    },
+    3: {
+        "name": "turquoise",
+        "colors": ['D9ED92', 'B5E48C', '99D98C', '76C893', '52B69A', '34A0A4', '168AAD', '1A759F', '1E6091', '184E77', '0F4C75', '023E8A', '03045E', '001D3D', '000814', '30FFFF']
+    },
+    6: {
+        "name": "Pastel",
+        "colors": ['FBF8CC', 'FDE4CF', 'FFCFD2', 'F1C0E8', 'CFBAF0', 'A3C4F3', '90DBF4', '8EECF5', '98F5E1', 'B9FBC0', 'B9FFC0', 'B9FFDD', 'B9FFEE', 'B9FFFF', '800000', 'FFFFFF']
+    },
+    4: {
+        "name": "Green-Blue",
+        "colors": ['D9ED92', 'B5E48C','99D98C','76C893','52B69A','34A0A4','168AAD','1A759F','1E6091','184E77','0F4C75','023E8A','03045E','FFFFFF']
+    },
+    5: {
+        "name": "Gradient",
+        "colors": None  # Will use color_gradient function
+    },
+    7: {
+        "name": "Purple", 
+        "colors": ['F72585', 'B5179E', '7209B7', '560BAD', '480CA8', '3A0CA3', '3F37C9', '4361EE', '4895EF', '4CC9F0', '7209B7', '480CA8', '3A0CA3', '240046', '10002B', 'FFFF30']
+    },
+    8: {
+        "name": "Watermelon",
+        "colors": ['EF476F', 'FFD166', '06D6A0', '118AB2', '073B4C', 'F72C25', 'F8961E', 'F9C74F', '90E0EF', '0077B6', '023047', '8ECAE6', '219EBC', '126782', '0A4D68', 'DDFFFF']
+    },
+    9: {
+        "name": "Ocean Blue",
+        "colors": ['03045E', '023E8A', '0077B6', '0096C7', '00B4D8', '48CAE4', '90E0EF', 'ADE8F4', 'CAF0F8', 'E0F4FF', '87CEEB', '5F9EA0', '4682B4', '1E90FF', '0000CD', 'DDFFFF']
+    },
+    10: {
+        "name": "Warm",
+        "colors": ['FBF8CC', 'FFF8DC', 'FFF0F5', 'FFE4E1', 'FFDAB9', 'FFC0CB', 'FFA07A', 'FF7F50', 'FF6347', 'FF4500', 'FF0000', 'DC143C', 'B22222', '8B0000', '800000', 'FFFFFF']
+    },
+}
+
+def interpolate_colors(base_colors, target_count):
+    """Interpolate colors to create a palette with target_count colors"""
+    print("number of colors in palette do not match AGE_LIMIT -> interpolating colors")
+    if target_count <= len(base_colors):
+        return base_colors[:target_count]
+    
+    result = []
+    # Calculate how many interpolated colors we need between each pair
+    segments = len(base_colors) - 1
+    colors_per_segment = target_count // segments
+    remaining = target_count % segments
+    
+    for i in range(segments):
+        start_color = base_colors[i]
+        end_color = base_colors[i + 1]
+        
+        # Add extra color to some segments if we have remainder
+        segment_colors = colors_per_segment + (1 if i < remaining else 0)
+        
+        # Generate interpolated colors for this segment
+        for j in range(segment_colors):
+            if j == 0:
+                result.append(start_color)
+            else:
+                # Interpolate between start and end
+                ratio = j / segment_colors
+                r = int(start_color[0] + (end_color[0] - start_color[0]) * ratio)
+                g = int(start_color[1] + (end_color[1] - start_color[1]) * ratio)
+                b = int(start_color[2] + (end_color[2] - start_color[2]) * ratio)
+                result.append((r, g, b))
+    
+    # Add the final color
+    if len(result) < target_count:
+        result.append(base_colors[-1])
+    
+    return result[:target_count]
+
+def palette_colors(palette_index, age_limit, reverse=True, alive_color=(0, 200, 0), special_color=(200, 100, 0)):
+    """COLOR_ARRAY of a palette for the given age limit, alive_color and special_color are used by the gradient palette"""
+    palette = COLOR_PALETTES[palette_index]
+    if palette["colors"] is None:  # Gradient palette
+        if age_limit > 15:
+            return color_gradient((0,20,0), alive_color, age_limit//2) + color_gradient(alive_color, special_color, age_limit//2 + 1)[1:]
+        return color_gradient((0,20,0), alive_color, 8) + color_gradient(alive_color, special_color, 7)[1:]
+
+    hex_colors = palette["colors"].copy()
+    if reverse:
+        hex_colors.reverse()
+    base_colors = [hex_to_rgb(hex_color) for hex_color in hex_colors]
+
+    # interpolate colors if AGE_LIMIT exceeds hardcoded palette
+    if age_limit > len(base_colors) - 1:
+        return interpolate_colors(base_colors, age_limit)
+    return base_colors
+
+def flicker_dead_color(color_array):
+    """Dead color for BIRTH 0 rules, a darker first palette color so toggling cells flicker less"""
+    # Reduce each RGB component by 40% (multiply by 0.6)
+    return tuple(max(0, int(c * 0.6)) for c in color_array[0])
+
+def find_palette(name):
+    """Palette index from an index or a (case-insensitive) palette name"""
+    if str(name).isdigit() and int(name) in COLOR_PALETTES:
+        return int(name)
+    for index, palette in COLOR_PALETTES.items():
+        if palette["name"].lower() == str(name).lower():
+            return index
+    raise ValueError(f"Unknown palette {name!r}, choose one of: " +
+                     ", ".join(f"{i} {p['name']}" for i, p in sorted(COLOR_PALETTES.items())))
+
+def palette_lut(color_array, dead_color):
+    """Lookup table from age to RGB: age 0 is dead_color, age v is color_array[v-1]"""
+    return np.array([dead_color] + list(color_array), dtype=np.uint8)
+
+def colorize(grid, lut):
+    """Map a grid of ages to an (h, w, 3) RGB array, ages past the palette use its last color"""
+    return lut[np.minimum(grid, len(lut) - 1)]
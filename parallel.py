@@ -0,0 +1,202 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from engine import step_grid, step_grid_age
+from cycles import combine_digests, state_digest
+
+# Multi-core banded stepping.
+# The grid lives in two shared-memory buffers (current and next generation).
+# A persistent pool of worker processes each owns a horizontal band of rows and
+# reads its band plus a one-row halo above and below from the current buffer,
+# then writes the band into the next buffer. Only short control messages go
+# through the pipes, grids are never pickled.
+# Every worker also hashes its band of the new generation for the cycle search
+# (reusing the last digest when the band did not change), the main process only
+# combines the band digests. BandedStepper plugs the pool into Simulator.stepper
+# (headless.py --workers) and hands out the shared buffer itself, so the main
+# process neither copies nor compares grids in a generation that was not edited.
+# Grids below PARALLEL_MIN_CELLS are stepped in the main process, there the
+# per-generation messages cost more than the workers save.
+
+PARALLEL_MIN_CELLS = 512 * 512
+
+def band_limits(height, bands):
+    """Split height rows into contiguous (start, stop) bands of nearly equal size"""
+    edges = np.linspace(0, height, bands + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+def worker_loop(conn, names, shape, dtype, y0, y1):
+    """Worker process: step rows y0..y1 whenever the main process asks for it"""
+    handles = [shared_memory.SharedMemory(name=name) for name in names]
+    buffers = [np.ndarray(shape, dtype=dtype, buffer=h.buf) for h in handles]
+    height = shape[0]
+    hy0, hy1 = max(y0 - 1, 0), min(y1 + 1, height)
+    rules = None
+    digests = [None, None]  # State digest of this band in each buffer, None if unknown
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == 'rules':
+                rules = message[1:]
+                digests = [None, None]
+            elif message[0] == 'step':
+                current, fresh = message[1:]
+                src, dst = buffers[current], buffers[1 - current]
+                birth, survive, age_limit, birth_age, survive_age, age_influence = rules
+                band = src[hy0:hy1]
+                if age_influence:
+                    band = step_grid_age(band, birth, survive, birth_age, survive_age, age_limit)
+                else:
+                    band = step_grid(band, birth, survive, age_limit)
+                dst[y0:y1] = band[y0 - hy0:y1 - hy0]
+
+                # The source band was copied in or edited since it was hashed when fresh
+                changed = not np.array_equal(dst[y0:y1], src[y0:y1])
+                if fresh or changed or digests[current] is None:
+                    digests[1 - current] = state_digest(dst[y0:y1], not age_influence)
+                else:
+                    digests[1 - current] = digests[current]
+                conn.send((digests[1 - current], changed))
+            else:
+                break
+    finally:
+        del buffers
+        for h in handles:
+            h.close()
+
+class ParallelStepper:
+    """Persistent pool of band workers stepping a grid held in shared memory"""
+
+    def __init__(self, grid, workers=None):
+        self.shape = grid.shape
+        self.dtype = grid.dtype
+        workers = workers or os.cpu_count() or 1
+
+        self.handles = [shared_memory.SharedMemory(create=True, size=max(grid.nbytes, 1)) for _ in range(2)]
+        self.buffers = [np.ndarray(self.shape, dtype=self.dtype, buffer=h.buf) for h in self.handles]
+        self.buffers[0][:] = grid
+        self.current = 0
+        self.rules = None
+        self.bands = band_limits(self.shape[0], workers)
+        self.fresh = True   # The current buffer was written by the main process since the workers hashed it
+        self.digest = None  # Combined band digests of the current generation
+        self.changed = True # Whether any band changed in the last generation
+
+        self.connections = []
+        self.processes = []
+        names = [h.name for h in self.handles]
+        for y0, y1 in self.bands:
+            parent, child = mp.Pipe()
+            process = mp.Process(target=worker_loop, args=(child, names, self.shape, self.dtype, y0, y1), daemon=True)
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    @property
+    def grid(self):
+        """Current generation (a view into shared memory, valid until the next step)"""
+        return self.buffers[self.current]
+
+    def set_grid(self, grid):
+        """Replace the current generation (must have the same shape)"""
+        self.buffers[self.current][:] = grid
+        self.invalidate()
+
+    def invalidate(self):
+        """Report that the current generation was written by the main process (e.g. edited in place)"""
+        self.fresh = True
+        self.digest = None
+
+    def step(self, birth, survive, age_limit, birth_age=(), survive_age=(), age_influence=False, generations=1):
+        """Advance the given number of generations, returns the current generation"""
+        rules = (frozenset(birth), frozenset(survive), age_limit,
+                 frozenset(birth_age), frozenset(survive_age), age_influence)
+        if rules != self.rules:
+            for conn in self.connections:
+                conn.send(('rules',) + rules)
+            self.rules = rules
+
+        for _ in range(generations):
+            for conn in self.connections:
+                conn.send(('step', self.current, self.fresh))
+            replies = [conn.recv() for conn in self.connections]
+            self.current = 1 - self.current
+            self.fresh = False
+            self.digest = combine_digests(self.shape, [digest for digest, _ in replies])
+            self.changed = any(changed for _, changed in replies)
+        return self.grid
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        for conn in self.connections:
+            try:
+                conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+        self.connections = []
+        self.processes = []
+        self.buffers = []
+        for h in self.handles:
+            h.close()
+            h.unlink()
+        self.handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class BandedStepper:
+    """Simulator stepper that runs grids of at least min_cells cells on a ParallelStepper pool"""
+
+    def __init__(self, workers=None, min_cells=PARALLEL_MIN_CELLS):
+        self.workers = workers
+        self.min_cells = min_cells
+        self.pool = None
+
+    def step(self, grid, birth, survive, age_limit, birth_age=(), survive_age=(), age_influence=False):
+        """Compute the next generation, same result as engine.step_grid / engine.step_grid_age
+
+        Large grids are returned as the pool's shared buffer, which the second step after this one
+        overwrites: keep a copy of any generation that has to outlive the next step."""
+        if grid.size < self.min_cells:
+            if age_influence:
+                return step_grid_age(grid, birth, survive, birth_age, survive_age, age_limit)
+            return step_grid(grid, birth, survive, age_limit)
+
+        if self.pool is None or self.pool.shape != grid.shape or self.pool.dtype != grid.dtype:
+            # Started on first use and restarted when the grid size or age resolution changes
+            self.close()
+            self.pool = ParallelStepper(grid, self.workers)
+        elif grid is not self.pool.grid:
+            # A generation from elsewhere (a new seed, a cycle extrapolation), edits in place need no copy
+            self.pool.set_grid(grid)
+        return self.pool.step(birth, survive, age_limit, birth_age, survive_age, age_influence)
+
+    def reset(self):
+        """The grid was edited in place, the workers hash their bands again on the next step"""
+        if self.pool is not None:
+            self.pool.invalidate()
+
+    def state_digest(self, grid, liveness_only=True):
+        """Cycle search digest of grid, taken from the workers when grid is the generation they just stepped"""
+        if grid.size < self.min_cells:
+            return state_digest(grid, liveness_only)
+        pool = self.pool
+        if pool is not None and grid is pool.grid and pool.digest is not None:
+            age_influence = pool.rules[-1]
+            if liveness_only != age_influence:
+                return pool.digest
+        # Hashed here the same way, band by band, so it matches the workers' digests
+        bands = pool.bands if pool is not None else band_limits(grid.shape[0], self.workers or os.cpu_count() or 1)
+        return combine_digests(grid.shape, [state_digest(grid[y0:y1], liveness_only) for y0, y1 in bands])
+
+    def close(self):
+        """Stop the worker pool, the next large step starts a new one"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
@@ -0,0 +1,212 @@
+import re
+import numpy as np
+from simulator import parse_rule, format_rule
+
+# Pattern import/export in the Golly formats.
+#   .rle   - run-length encoded, "x = 3, y = 3, rule = B3/S23" header, b/o/$ runs
+#   .cells - plaintext, '!' comments, '.' dead and 'O' alive
+# The decoders are vectorized over the raw bytes of the file (no per-cell or
+# per-token Python objects) and write straight into a preallocated grid, so
+# patterns with millions of cells load in a fraction of a second.
+# Loaded cells get age 1. In multi-state RLE every state other than b/. is alive.
+
+RLE_LINE_LENGTH = 70  # Maximum line length of written RLE files, like Golly
+
+_DIGIT_LOW, _DIGIT_HIGH = ord("0"), ord("9")
+_DEAD_TAGS = np.frombuffer(b"b.", dtype=np.uint8)
+_ROW_TAG = ord("$")
+
+def rule_from_header(rule):
+    """(birth, survive) from an RLE rule like B3/S23, S23/B3 or 23/3, ignoring a :T bounded-grid suffix"""
+    rule = rule.split(":", 1)[0].strip().upper()
+    if re.fullmatch(r"\d*/\d*", rule):
+        survive, birth = rule.split("/")
+        rule = f"B{birth}/S{survive}"
+    elif re.fullmatch(r"S\d*/B\d*", rule):
+        survive, birth = rule.split("/")
+        rule = f"{birth}/{survive}"
+    return parse_rule(rule)
+
+def place(pattern_shape, grid_shape, offset=None):
+    """Top left corner of a pattern in the grid, centered unless an (x, y) offset is given"""
+    h, w = pattern_shape
+    if offset is None:
+        x, y = (grid_shape[1] - w) // 2, (grid_shape[0] - h) // 2
+    else:
+        x, y = offset
+    if h > grid_shape[0] or w > grid_shape[1] or x < 0 or y < 0 or x + w > grid_shape[1] or y + h > grid_shape[0]:
+        raise ValueError(f"Pattern of {w}x{h} cells does not fit in the {grid_shape[1]}x{grid_shape[0]} grid")
+    return x, y
+
+def decode_rle(data, grid, offset=None):
+    """Decode RLE bytes into grid (cleared first), returns (width, height, rule or None)"""
+    # Header: comment lines starting with '#', then "x = .., y = .., rule = .."
+    body_start = 0
+    while True:
+        if body_start >= len(data):
+            raise ValueError("RLE header line 'x = .., y = ..' is missing")
+        line_end = data.find(b"\n", body_start)
+        line_end = len(data) if line_end < 0 else line_end
+        line = data[body_start:line_end].strip()
+        body_start = line_end + 1
+        if not line or line.startswith(b"#"):
+            continue
+        if line[:1] not in (b"x", b"X"):
+            raise ValueError("RLE header line 'x = .., y = ..' is missing")
+        header = line.decode("ascii", "replace")
+        break
+    fields = dict(re.findall(r"(\w+)\s*=\s*([^,]+)", header))
+    width, height = int(fields["x"]), int(fields["y"])
+    rule = rule_from_header(fields["rule"]) if "rule" in fields else None
+
+    body = np.frombuffer(data, dtype=np.uint8, offset=min(body_start, len(data)))
+    end = np.flatnonzero(body == ord("!"))
+    body = body[:end[0]] if len(end) else body
+    body = body[body > ord(" ")]  # Drop whitespace and line breaks
+
+    # Every non-digit byte is a tag, its run count is the number made of the digits before it
+    is_digit = (body >= _DIGIT_LOW) & (body <= _DIGIT_HIGH)
+    tags = np.flatnonzero(~is_digit)
+    digits = np.flatnonzero(is_digit)
+    counts = np.ones(len(tags), dtype=np.int64)
+    if len(digits):
+        owner = np.searchsorted(tags, digits)  # Index of the tag each digit belongs to
+        if owner[-1] >= len(tags):
+            raise ValueError("RLE data ends with a run count")
+        place_value = 10 ** (tags[owner] - digits - 1).astype(np.int64)
+        values = np.zeros(len(tags), dtype=np.int64)
+        np.add.at(values, owner, (body[digits] - _DIGIT_LOW).astype(np.int64) * place_value)
+        has_count = np.zeros(len(tags), dtype=bool)
+        has_count[owner] = True
+        counts[has_count] = values[has_count]
+
+    tag_bytes = body[tags]
+    new_row = tag_bytes == _ROW_TAG
+    cells = ~new_row
+
+    # Row of every tag, and the column it starts at (cells since the start of its row)
+    rows = np.cumsum(np.where(new_row, counts, 0)) - np.where(new_row, counts, 0)
+    cell_counts = np.where(cells, counts, 0)
+    cells_before = np.cumsum(cell_counts) - cell_counts
+    row_start = np.maximum.accumulate(np.where(new_row, np.cumsum(cell_counts), 0))
+    row_start = np.concatenate(([0], row_start[:-1]))
+    columns = cells_before - row_start
+
+    alive = cells & ~np.isin(tag_bytes, _DEAD_TAGS)
+    starts, lengths, run_rows = columns[alive], counts[alive], rows[alive]
+    if len(starts) and (run_rows.max() >= height or (starts + lengths).max() > width):
+        raise ValueError(f"RLE data does not fit its {width}x{height} header")
+
+    x, y = place((height, width), grid.shape, offset)
+    grid.fill(0)
+    # Expand the runs into cell coordinates: run start plus the position inside the run
+    run_offsets = np.cumsum(lengths) - lengths
+    cell_rows = np.repeat(run_rows, lengths)
+    cell_columns = np.arange(int(lengths.sum())) + np.repeat(starts - run_offsets, lengths)
+    grid[cell_rows + y, cell_columns + x] = 1
+    return width, height, rule
+
+def decode_cells(data, grid, offset=None):
+    """Decode plaintext .cells bytes into grid (cleared first), returns (width, height)"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(raw == ord("\n"))
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_starts = line_starts[line_starts < len(raw)]
+    line_of_byte = np.cumsum(np.concatenate(([0], raw[:-1] == ord("\n")))) if len(raw) else raw
+
+    # Comment lines do not count as rows
+    is_pattern_line = raw[line_starts] != ord("!")
+    row_of_line = np.cumsum(is_pattern_line) - 1
+    alive = np.flatnonzero(((raw == ord("O")) | (raw == ord("*"))) & is_pattern_line[line_of_byte])
+    line = line_of_byte[alive]
+    rows, columns = row_of_line[line], alive - line_starts[line]
+
+    ends = np.concatenate((newlines, [len(raw)]))[:len(line_starts)]
+    line_lengths = ends - line_starts - (raw[np.maximum(ends - 1, 0)] == ord("\r"))
+    height = int(np.count_nonzero(is_pattern_line))
+    width = int(line_lengths[is_pattern_line].max()) if height else 0
+
+    x, y = place((height, width), grid.shape, offset)
+    grid.fill(0)
+    grid[rows + y, columns + x] = 1
+    return width, height
+
+def load_pattern(path, grid, offset=None):
+    """Load a .rle or .cells file into grid, returns the rule from an RLE header as (birth, survive) or None"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.lower().endswith(".cells"):
+        decode_cells(data, grid, offset)
+        return None
+    return decode_rle(data, grid, offset)[2]
+
+def bounding_box(alive):
+    """(y0, y1, x0, x1) of the live cells"""
+    rows, cols = np.flatnonzero(alive.any(axis=1)), np.flatnonzero(alive.any(axis=0))
+    if len(rows) == 0:
+        return 0, 0, 0, 0
+    return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+def rle_tokens(alive):
+    """Yield the RLE tokens ("3o", "2b", "4$", ...) of a boolean grid"""
+    h, w = alive.shape
+    if alive.size == 0:
+        return
+    # Every row ends with a sentinel 2, run boundaries are where the value changes
+    cells = np.full((h, w + 1), 2, dtype=np.int8)
+    cells[:, :w] = alive
+    flat = cells.ravel()
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    lengths = np.diff(np.concatenate((starts, [len(flat)])))
+    values = flat[starts]
+
+    # Dead runs at the end of a row are dropped, row ends in a row are merged into "n$"
+    keep = ~((values == 0) & (np.concatenate((values[1:], [2])) == 2))
+    starts, lengths, values = starts[keep], lengths[keep], values[keep]
+    row_end = values == 2
+    lengths[row_end] = 1
+    group = np.concatenate(([True], ~(row_end[1:] & row_end[:-1])))
+    run_id = np.cumsum(group) - 1
+    lengths = np.bincount(run_id, weights=lengths).astype(np.int64)
+    values = values[group]
+
+    # The last row end is replaced by '!'
+    for value, length in zip(values[:-1].tolist(), lengths[:-1].tolist()):
+        tag = "$" if value == 2 else "o" if value else "b"
+        yield f"{length}{tag}" if length > 1 else tag
+
+def save_rle(path, grid, birth=None, survive=None):
+    """Write the live cells of grid as an RLE file, with the rule in the header if given"""
+    alive = grid > 0
+    y0, y1, x0, x1 = bounding_box(alive)
+    header = f"x = {x1 - x0}, y = {y1 - y0}"
+    if birth is not None:
+        header += f", rule = {format_rule(birth, survive)}"
+    with open(path, "w") as f:
+        f.write(header + "\n")
+        line = ""
+        for token in rle_tokens(alive[y0:y1, x0:x1]):
+            if len(line) + len(token) > RLE_LINE_LENGTH:
+                f.write(line + "\n")
+                line = ""
+            line += token
+        f.write(line + "!\n")
+
+def save_cells(path, grid, name=None):
+    """Write the live cells of grid as a plaintext .cells file"""
+    alive = grid > 0
+    y0, y1, x0, x1 = bounding_box(alive)
+    text = np.where(alive[y0:y1, x0:x1], ord("O"), ord(".")).astype(np.uint8)
+    lines = np.full((y1 - y0, x1 - x0 + 1), ord("\n"), dtype=np.uint8)
+    lines[:, :-1] = text
+    with open(path, "wb") as f:
+        if name:
+            f.write(f"!Name: {name}\n".encode())
+        f.write(lines.tobytes())
+
+def save_pattern(path, grid, birth=None, survive=None):
+    """Write grid as .cells or (any other extension) .rle"""
+    if path.lower().endswith(".cells"):
+        save_cells(path, grid)
+    else:
+        save_rle(path, grid, birth, survive)
@@ -0,0 +1,112 @@
+import csv
+import time
+import numpy as np
+from numpy.lib.format import open_memmap
+
+# Per-frame profiling of the main loop.
+# lap(phase) adds the time since the previous lap (or the start of the frame) to
+# a phase, skip() starts the next lap without counting the time in between.
+# frame_done() stores the frame in a ring of the last HISTORY frames, from which
+# the overlay shows the average and p95 of every phase. Frames can also be
+# streamed to a log file:
+#   .csv  - one row per frame
+#   .npy  - ring buffer of the last RING_FRAMES frames, a float64 array written in
+#           place through a memory map, so it always holds the frames before a stall
+# Columns of both: frame number, unix time, every phase and the whole frame, in ms.
+# Rows of the ring buffer that were not written yet are NaN.
+
+PHASES = ("events", "update_grid", "draw_grid", "ui", "flip", "wait")
+HISTORY = 240       # Frames in the rolling statistics, 4 seconds at 60 fps
+RING_FRAMES = 3600  # Frames in a ring-buffer log file, one minute at 60 fps
+CSV_FLUSH = 60      # Frames between flushes of a CSV log
+
+class FrameProfiler:
+    """Phase timings per displayed frame with rolling average, p95 and CSV or ring-buffer export"""
+
+    def __init__(self, phases=PHASES, history=HISTORY):
+        self.phases = tuple(phases)
+        self.columns = {phase: i for i, phase in enumerate(self.phases)}
+        self.history = np.zeros((history, len(self.phases) + 1))  # Phases and the whole frame
+        self.frames = 0
+        self.current = [0.0] * len(self.phases)
+        self.frame_start = self.last = time.perf_counter()
+        self.log_path = None
+        self.log_file = None
+        self.log_writer = None
+        self.ring = None
+
+    def lap(self, phase):
+        """Add the time since the previous lap to phase"""
+        now = time.perf_counter()
+        self.current[self.columns[phase]] += now - self.last
+        self.last = now
+
+    def skip(self):
+        """Start the next lap now, the time since the previous lap is not counted"""
+        self.last = time.perf_counter()
+
+    def add(self, phase, seconds):
+        """Add time measured elsewhere (like the simulation thread) to phase"""
+        self.current[self.columns[phase]] += seconds
+
+    def frame_done(self):
+        now = time.perf_counter()
+        row = self.current + [now - self.frame_start]
+        self.history[self.frames % len(self.history)] = row
+        if self.log_path is not None:
+            self.write_log(row)
+        self.frames += 1
+        self.current = [0.0] * len(self.phases)
+        self.frame_start = self.last = now
+
+    def stats(self):
+        """(name, average, p95) in seconds of every phase and the whole frame over the last frames"""
+        count = min(self.frames, len(self.history))
+        if count == 0:
+            return []
+        data = self.history[:count]
+        return list(zip(self.phases + ("frame",), data.mean(axis=0), np.percentile(data, 95, axis=0)))
+
+    def status_lines(self):
+        """Overlay lines: average and p95 of every phase in ms"""
+        lines = ["PROFILE (avg / p95 ms)"]
+        for name, average, p95 in self.stats():
+            lines.append(f"{name}: {average * 1000:.2f} / {p95 * 1000:.2f}")
+        if self.log_path is not None:
+            lines.append(f"Log: {self.log_path}")
+        return lines
+
+    def open_log(self, path):
+        """Stream frames to a .csv file, or keep the last RING_FRAMES in a .npy ring buffer"""
+        self.close_log()
+        header = ["frame", "time"] + list(self.phases) + ["frame_ms"]
+        if path.lower().endswith(".npy"):
+            self.ring = open_memmap(path, mode="w+", dtype=np.float64, shape=(RING_FRAMES, len(header)))
+            self.ring[:] = np.nan
+        else:
+            self.log_file = open(path, "w", newline="")
+            self.log_writer = csv.writer(self.log_file)
+            self.log_writer.writerow(header)
+        self.log_path = path
+
+    def write_log(self, row):
+        values = [self.frames, time.time()] + [seconds * 1000 for seconds in row]
+        if self.ring is not None:
+            self.ring[self.frames % len(self.ring)] = values
+        else:
+            self.log_writer.writerow([values[0], f"{values[1]:.3f}"] + [f"{v:.3f}" for v in values[2:]])
+            if self.frames % CSV_FLUSH == 0:
+                self.log_file.flush()
+
+    def close_log(self):
+        """Flush and close the log file, returns its path (None if there was none)"""
+        path = self.log_path
+        if self.ring is not None:
+            self.ring.flush()
+            self.ring = None
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+            self.log_writer = None
+        self.log_path = None
+        return path
@@ -0,0 +1,227 @@
+import argparse
+import json
+import mmap
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+
+# Compressed, seekable recordings of simulation runs (.golrec).
+#
+# File layout (append-only, little endian):
+#   MAGIC, u32 header length, JSON header (width, height, dtype, keyframe_interval)
+#   records: u8 kind, u64 generation, u32 payload length, zlib payload
+#     KEYFRAME - the full grid
+#     DELTA    - grid minus the previous recorded grid (wrapping), mostly zeros
+#                and runs of 1 for cells that only aged, so it compresses well
+#   index:   (generation, offset, kind) per record, u64 index offset, INDEX_MAGIC
+# The index is written on close. A file without it (crashed run) is indexed by
+# scanning the records, a truncated last record is ignored.
+#
+# Playback memory-maps the file and seeks to a generation by decoding from the
+# nearest keyframe before it.
+
+MAGIC = b"GOLREC1\0"
+INDEX_MAGIC = b"GOLIDX1\0"
+RECORD = struct.Struct("<BQI")
+FOOTER = struct.Struct("<Q")
+INDEX_DTYPE = np.dtype([("generation", "<u8"), ("offset", "<u8"), ("kind", "<u8")])
+KEYFRAME, DELTA = 0, 1
+
+KEYFRAME_INTERVAL = 256  # Records between keyframes, bounds the decoding work of a seek
+QUEUE_SIZE = 64          # Grids waiting for the writer thread before write() blocks
+COMPRESSION_LEVEL = 1
+
+class Recorder:
+    """Streams generations to a .golrec file, compressing and writing on a background thread"""
+
+    def __init__(self, path, shape, dtype, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.keyframe_interval = keyframe_interval
+        self.file = open(path, "wb")
+        header = json.dumps({"width": self.shape[1], "height": self.shape[0], "dtype": self.dtype.str,
+                             "keyframe_interval": keyframe_interval}).encode()
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+        self.index = []
+        self.previous = None
+        self.last_generation = None
+        self.error = None
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.thread = threading.Thread(target=self.writer_loop, name="recorder", daemon=True)
+        self.thread.start()
+
+    def write(self, grid, generation):
+        """Queue a generation for writing, the grid is copied so the caller may keep changing it"""
+        if grid.shape != self.shape:
+            raise ValueError(f"Recording is {self.shape[1]}x{self.shape[0]}, got a {grid.shape[1]}x{grid.shape[0]} grid")
+        if self.error is not None:
+            raise self.error
+        # Blocks when the writer falls behind, so no generation is dropped
+        self.queue.put((grid.astype(self.dtype, copy=True), generation))
+
+    def writer_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                self.write_record(*item)
+            except OSError as e:
+                self.error = e
+
+    def write_record(self, grid, generation):
+        if self.last_generation is not None and generation <= self.last_generation:
+            # The run was restarted or went back, later deltas must not depend on the future
+            self.previous = None
+        if self.previous is None or len(self.index) % self.keyframe_interval == 0:
+            kind, data = KEYFRAME, grid
+        else:
+            kind, data = DELTA, grid - self.previous
+        payload = zlib.compress(data.tobytes(), COMPRESSION_LEVEL)
+        self.index.append((generation, self.file.tell(), kind))
+        self.file.write(RECORD.pack(kind, generation, len(payload)) + payload)
+        self.previous = grid
+        self.last_generation = generation
+
+    def close(self):
+        """Flush the queue, write the index and close the file"""
+        self.queue.put(None)
+        self.thread.join()
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.index, dtype=INDEX_DTYPE).tobytes())
+        self.file.write(FOOTER.pack(index_offset) + INDEX_MAGIC)
+        self.file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Playback:
+    """Memory-mapped reader of a .golrec file with random access by generation"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        header_length, = struct.unpack_from("<I", self.map, len(MAGIC))
+        self.records_start = len(MAGIC) + 4 + header_length
+        self.header = json.loads(self.map[len(MAGIC) + 4:self.records_start])
+        self.shape = (self.header["height"], self.header["width"])
+        self.dtype = np.dtype(self.header["dtype"])
+        self.index = self.read_index()
+        self.keyframes = np.flatnonzero(self.index["kind"] == KEYFRAME)
+        self.sorted = bool(np.all(np.diff(self.index["generation"].astype(np.int64)) > 0))
+        self.cached = (None, None)  # Last decoded (record number, grid) for sequential reads
+
+    def read_index(self):
+        tail = len(INDEX_MAGIC) + FOOTER.size
+        if len(self.map) >= self.records_start + tail and self.map[-len(INDEX_MAGIC):] == INDEX_MAGIC:
+            index_offset, = FOOTER.unpack_from(self.map, len(self.map) - tail)
+            # Copied, so the map can be closed while the index is still referenced
+            return np.frombuffer(self.map, dtype=INDEX_DTYPE, offset=index_offset,
+                                 count=(len(self.map) - tail - index_offset) // INDEX_DTYPE.itemsize).copy()
+
+        # No index (the recording was not closed), scan the records
+        entries = []
+        offset = self.records_start
+        while offset + RECORD.size <= len(self.map):
+            kind, generation, length = RECORD.unpack_from(self.map, offset)
+            if offset + RECORD.size + length > len(self.map):
+                break
+            entries.append((generation, offset, kind))
+            offset += RECORD.size + length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    @property
+    def generations(self):
+        """Recorded generation numbers in recording order"""
+        return self.index["generation"]
+
+    def __len__(self):
+        return len(self.index)
+
+    def decode(self, record):
+        offset = int(self.index["offset"][record])
+        kind, generation, length = RECORD.unpack_from(self.map, offset)
+        start = offset + RECORD.size
+        data = np.frombuffer(zlib.decompress(self.map[start:start + length]), dtype=self.dtype)
+        return kind, data.reshape(self.shape)
+
+    def record(self, record):
+        """Grid of the record with the given position in the recording"""
+        cached_record, cached_grid = self.cached
+        # Decode forward from the nearest keyframe, or from the cached record if that is closer
+        start = int(self.keyframes[np.searchsorted(self.keyframes, record, side="right") - 1])
+        if cached_record is not None and start <= cached_record <= record:
+            start, grid = cached_record + 1, cached_grid
+        else:
+            grid = None
+        for r in range(start, record + 1):
+            kind, data = self.decode(r)
+            grid = data.copy() if kind == KEYFRAME else grid + data
+        self.cached = (record, grid)
+        return grid.copy()
+
+    def read(self, generation):
+        """Grid of the given generation, KeyError if it was not recorded"""
+        if self.sorted:
+            record = int(np.searchsorted(self.generations, generation))
+            found = record < len(self) and self.generations[record] == generation
+        else:
+            # The run was restarted, the last recording of the generation wins
+            matches = np.flatnonzero(self.generations == generation)
+            found = len(matches) > 0
+            record = int(matches[-1]) if found else None
+        if not found:
+            raise KeyError(f"Generation {generation} is not in the recording")
+        return self.record(record)
+
+    def __iter__(self):
+        for record in range(len(self)):
+            yield int(self.generations[record]), self.record(record)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a .golrec recording")
+    parser.add_argument("path")
+    parser.add_argument("--generation", type=int, help="generation to extract")
+    parser.add_argument("--output", help="write the extracted generation to this .npy file")
+    args = parser.parse_args(argv)
+
+    with Playback(args.path) as playback:
+        generations = playback.generations
+        keyframes = int(np.count_nonzero(playback.index["kind"] == KEYFRAME))
+        print(f"[INFO] {playback.shape[1]}x{playback.shape[0]} {playback.dtype.name}, {len(playback)} records "
+              f"(generations {generations[0] if len(playback) else '-'}-{generations[-1] if len(playback) else '-'}), "
+              f"{keyframes} keyframes")
+        if args.generation is not None:
+            try:
+                grid = playback.read(args.generation)
+            except KeyError as e:
+                raise SystemExit(f"[ERROR] {e.args[0]}")
+            print(f"[INFO] Generation {args.generation}: population {int(np.count_nonzero(grid))}")
+            if args.output:
+                np.save(args.output, grid)
+
+if __name__ == "__main__":
+    main()
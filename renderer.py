@@ -0,0 +1,103 @@
+import pygame
+import numpy as np
+from palettes import palette_lut
+
+# Vectorized grid renderer.
+# Ages are mapped to colors through a palette lookup table, written into a
+# surface with one pixel per cell and scaled up to CELL_SIZE in one blit.
+# The grid lines are a separate overlay that is only rebuilt when the grid
+# dimensions or the cell size change. draw_changed() only redraws the rows
+# that differ from the last drawn grid, for pygame.display.update(rects).
+
+GRID_LINE_KEY = (255, 0, 255)  # Transparent color of the grid-line overlay
+
+def mapped_lut(surface, lut):
+    """Convert an RGB lookup table to the surface's packed pixel values"""
+    shifts, losses = surface.get_shifts(), surface.get_losses()
+    lut = lut.astype(np.uint32)
+    return ((lut[:, 0] >> losses[0]) << shifts[0]) | ((lut[:, 1] >> losses[1]) << shifts[1]) | ((lut[:, 2] >> losses[2]) << shifts[2])
+
+class GridRenderer:
+    """Draws the age grid with a palette lookup and cached surfaces"""
+
+    def __init__(self):
+        self.color_array = None
+        self.dead_color = None
+        self.lut = None
+        self.pixel_lut = None
+        self.layout = None
+        self.cell_surface = None
+        self.grid_lines = None
+        self.last_grid = None
+
+    def update_palette(self, color_array, dead_color):
+        # COLOR_ARRAY is replaced (not modified) whenever the palette changes
+        if color_array is not self.color_array or dead_color != self.dead_color:
+            self.color_array = color_array
+            self.dead_color = dead_color
+            self.lut = palette_lut(color_array, dead_color)
+            # The cell surface is always 32 bit, so packed pixels can be written directly
+            self.pixel_lut = mapped_lut(pygame.Surface((1, 1), 0, 32), self.lut)
+
+    def update_layout(self, grid_size_x, grid_size_y, cell_size, grid_color):
+        layout = (grid_size_x, grid_size_y, cell_size, grid_color)
+        if layout == self.layout:
+            return
+        self.layout = layout
+        width, height = grid_size_x * cell_size, grid_size_y * cell_size
+        self.cell_surface = pygame.Surface((grid_size_x, grid_size_y), 0, 32)
+
+        # One-pixel outline around every cell, like pygame.draw.rect(..., 1)
+        xs = np.arange(width) % cell_size
+        ys = np.arange(height) % cell_size
+        on_line = ((xs == 0) | (xs == cell_size - 1))[:, None] | ((ys == 0) | (ys == cell_size - 1))[None, :]
+        lines = np.where(on_line[..., None], np.array(grid_color, dtype=np.uint8), np.array(GRID_LINE_KEY, dtype=np.uint8))
+        self.grid_lines = pygame.Surface((width, height))
+        pygame.surfarray.blit_array(self.grid_lines, lines)
+        self.grid_lines.set_colorkey(GRID_LINE_KEY)
+
+    def draw(self, surface, grid, cell_size, color_array, dead_color, grid_color):
+        """Draw the grid at the top left of surface"""
+        grid_size_y, grid_size_x = grid.shape
+        self.update_palette(color_array, dead_color)
+        self.update_layout(grid_size_x, grid_size_y, cell_size, grid_color)
+
+        self.update_cells(grid)
+        game_area = surface.subsurface((0, 0) + self.grid_lines.get_size())
+        pygame.transform.scale(self.cell_surface, game_area.get_size(), game_area)
+        surface.blit(self.grid_lines, (0, 0))
+        self.last_grid = grid.copy()
+
+    def update_cells(self, grid):
+        # surfarray uses (x, y) indexing
+        pixels = self.pixel_lut[np.minimum(grid.T, len(self.pixel_lut) - 1)]
+        pygame.surfarray.blit_array(self.cell_surface, pixels)
+
+    def draw_changed(self, surface, grid, cell_size, color_array, dead_color, grid_color):
+        """Redraw only the cells that changed since the last draw, returns the rects to pass to display.update"""
+        grid_size_y, grid_size_x = grid.shape
+        if (self.last_grid is None or self.last_grid.shape != grid.shape
+                or color_array is not self.color_array or dead_color != self.dead_color
+                or (grid_size_x, grid_size_y, cell_size, grid_color) != self.layout):
+            self.draw(surface, grid, cell_size, color_array, dead_color, grid_color)
+            return [pygame.Rect((0, 0), self.grid_lines.get_size())]
+
+        changed = grid != self.last_grid
+        changed_rows = changed.any(axis=1)
+        if not changed_rows.any():
+            return []
+        self.update_cells(grid)
+
+        # One rect per band of consecutive changed rows, spanning its changed columns
+        rects = []
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], changed_rows.view(np.int8), [0]))))
+        for y0, y1 in zip(edges[::2], edges[1::2]):
+            cols = np.flatnonzero(changed[y0:y1].any(axis=0))
+            x0, x1 = cols[0], cols[-1] + 1
+            rect = pygame.Rect(x0 * cell_size, y0 * cell_size, (x1 - x0) * cell_size, (y1 - y0) * cell_size)
+            cells = self.cell_surface.subsurface((x0, y0, x1 - x0, y1 - y0))
+            pygame.transform.scale(cells, rect.size, surface.subsurface(rect))
+            surface.blit(self.grid_lines, rect, rect)
+            rects.append(rect)
+        self.last_grid = grid.copy()
+        return rects
@@ -0,0 +1,132 @@
+import argparse
+import time
+import numpy as np
+from numpy.lib.format import open_memmap
+from engine import age_increment, age_table, rule_table
+from simulator import Simulator, RULE_PRESETS, AGE_RULE_PRESETS, parse_rule
+
+# Streaming scanline engine, a model of the ASIC datapath that computes the next
+# generation while the pixels scan out. Rows enter one at a time and a rolling
+# window of three rows (above, current, below) is held in line buffers. An output
+# row is produced as soon as the row below it has arrived, so the latency is one
+# row and the state is O(width). Each row is processed at once, vectorized over
+# its cells, instead of modeling the pixel clock.
+# Counts include the cell itself and cells outside the grid count as dead, so the
+# rows equal those of step_grid / step_grid_age. A row has been read completely
+# before its output row is yielded, so outputs may be written back into the
+# source grid in place (one frame buffer, like the hardware), and stages can be
+# chained to stream several generations in one pass.
+# Example, 100 generations of a grid too large for memory:
+#   python scanline.py huge.npy next.npy -n 100 --rule B3/S23
+
+STORED_ROWS = 2  # Line buffers of the hardware: the row above and the current row, the row below streams in
+
+def line_buffer_bits(width, age_bits):
+    """Line buffer size in bits for a grid of the given width and age resolution"""
+    return STORED_ROWS * width * age_bits
+
+def window_row(above, current, below):
+    """3x3 window sums of the current row from the count planes of three rows, edges count as 0"""
+    columns = np.zeros(len(current) + 2, dtype=np.uint8)
+    columns[1:-1] = above + current + below
+    return columns[:-2] + columns[1:-1] + columns[2:]
+
+class ScanlineStepper:
+    """Next-generation rows from a stream of grid rows, holding a rolling window of three rows"""
+
+    def __init__(self, birth, survive, age_limit, birth_age=None, survive_age=None):
+        self.birth_table = rule_table(birth)
+        self.survive_table = rule_table(survive, offset=1)
+        self.age_limit = age_limit
+        self.age_tables = None
+        if birth_age is not None:
+            # Same table sizing as step_grid_age
+            size = max(age_limit, max(birth_age, default=0), max(survive_age, default=0)) + 2
+            self.age_tables = (age_table(birth_age, size), age_table(survive_age, size))
+
+    def count_planes(self, row):
+        """(birth, survive) planes of the cells a row contributes to the counts"""
+        if self.age_tables is None:
+            alive = (row > 0).view(np.uint8)
+            return alive, alive
+        birth_table, survive_table = self.age_tables
+        ages = np.minimum(row, len(birth_table) - 1)
+        return birth_table[ages].view(np.uint8), survive_table[ages].view(np.uint8)
+
+    def step_row(self, row, above, current, below):
+        """Next generation of row, given the count planes of the rows above, itself and below"""
+        birth_counts = window_row(above[0], current[0], below[0])
+        if self.age_tables is None:
+            survive_counts = birth_counts
+        else:
+            survive_counts = window_row(above[1], current[1], below[1])
+
+        alive = row > 0
+        survivors = alive & self.survive_table[survive_counts]
+        born = ~alive & self.birth_table[birth_counts]
+        new_row = np.where(survivors, age_increment(row, self.age_limit), 0).astype(row.dtype, copy=False)
+        new_row[born] = 1
+        return new_row
+
+    def rows(self, source):
+        """Yield the next generation row by row while reading the rows of source"""
+        source = iter(source)
+        row = next(source, None)
+        if row is None:
+            return
+        empty = np.zeros(len(row), dtype=np.uint8)
+        above, current = (empty, empty), self.count_planes(row)
+        for next_row in source:
+            below = self.count_planes(next_row)
+            yield self.step_row(row, above, current, below)
+            row, above, current = next_row, current, below
+        yield self.step_row(row, above, current, (empty, empty))
+
+def stream_generations(rows, generations, birth, survive, age_limit, birth_age=None, survive_age=None):
+    """Rows of the grid generations steps after the streamed one, one pipelined stepper per generation"""
+    for _ in range(generations):
+        rows = ScanlineStepper(birth, survive, age_limit, birth_age, survive_age).rows(rows)
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step a .npy grid with the streaming scanline engine")
+    parser.add_argument("input", help=".npy grid, read through a memory map")
+    parser.add_argument("output", help=".npy file for the result, written through a memory map")
+    parser.add_argument("-n", "--generations", type=int, default=1, help="number of generations (pipelined stages)")
+    rules = parser.add_mutually_exclusive_group()
+    rules.add_argument("--preset", type=int, help="rule preset index (0-9)")
+    rules.add_argument("--rule", help="rule string like B3/S23")
+    parser.add_argument("--age-influence", action="store_true", help="use age-filtered neighbor counts")
+    parser.add_argument("--age-resolution", type=int, default=4, help="number of age bits (1-20)")
+    args = parser.parse_args(argv)
+
+    # A 1x1 simulator only holds the rules
+    sim = Simulator(1, 1, max(1, min(20, args.age_resolution)), args.age_influence)
+    if args.preset is not None:
+        presets = AGE_RULE_PRESETS if args.age_influence else RULE_PRESETS
+        if not 0 <= args.preset < len(presets):
+            raise SystemExit(f"[ERROR] Preset must be 0-{len(presets) - 1}")
+        sim.apply_preset(args.preset)
+    elif args.rule:
+        try:
+            sim.birth, sim.survive = parse_rule(args.rule)
+        except ValueError as e:
+            raise SystemExit(f"[ERROR] {e}")
+
+    grid = np.load(args.input, mmap_mode="r")
+    if grid.ndim != 2:
+        raise SystemExit(f"[ERROR] {args.input} is not a 2D grid")
+    output = open_memmap(args.output, mode="w+", dtype=grid.dtype, shape=grid.shape)
+    age_rules = (sim.birth_age, sim.survive_age) if sim.age_influence else (None, None)
+
+    start = time.perf_counter()
+    rows = stream_generations(grid, args.generations, sim.birth, sim.survive, sim.age_limit, *age_rules)
+    for y, row in enumerate(rows):
+        output[y] = row
+    output.flush()
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] {grid.shape[1]}x{grid.shape[0]}: {args.generations} generations in {elapsed:.3f}s, "
+          f"line buffers {line_buffer_bits(grid.shape[1], sim.age_limit.bit_length())} bits per stage")
+
+if __name__ == "__main__":
+    main()
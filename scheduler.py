@@ -0,0 +1,83 @@
+import math
+import time
+
+# Adaptive frame scheduler.
+# Measures how long a generation and a draw take and decides, for a target
+# display FPS, how often the grid is drawn and how many generations are
+# advanced per displayed frame. Drawing may use at most DRAW_SHARE of the
+# frame time, a slower draw is only done every n-th frame (input is still
+# handled every frame). In max speed mode the worker gets the rest of each
+# displayed frame, otherwise it keeps the requested generations/second.
+
+DRAW_SHARE = 0.5      # Part of the frame time that drawing may use
+SMOOTHING = 0.1       # Weight of the newest measurement in the moving averages
+MAX_DRAW_EVERY = 30   # Draw at least every 30th frame (twice a second at 60 fps)
+RATE_WINDOW = 1.0     # Seconds over which the real rates are measured
+
+class FrameScheduler:
+    """Picks generations per frame and draw skipping from measured step and draw times"""
+
+    def __init__(self, target_fps=60):
+        self.target_fps = target_fps
+        self.draw_seconds = 0.0
+        self.draw_every = 1
+        self.generations_per_frame = 1.0
+        self.generations_per_second = 1
+        self.frame = 0
+
+        # Measured over the last RATE_WINDOW
+        self.display_fps = 0.0
+        self.real_generations_per_second = 0.0
+        self.draws = 0
+        self.window_start = (time.perf_counter(), 0, None)
+
+    def record_draw(self, seconds):
+        if self.draw_seconds == 0:
+            self.draw_seconds = seconds
+        else:
+            self.draw_seconds += SMOOTHING * (seconds - self.draw_seconds)
+
+    def plan(self, step_seconds, generations_per_second, max_speed):
+        """Update draw_every, generations_per_frame and the worker's generations_per_second"""
+        frame_time = 1 / self.target_fps
+        self.draw_every = min(MAX_DRAW_EVERY, max(1, math.ceil(self.draw_seconds / (frame_time * DRAW_SHARE))))
+        drawn_fps = self.target_fps / self.draw_every
+
+        if max_speed:
+            # As many generations as fit next to the drawing of a displayed frame
+            spare = self.draw_every * frame_time - self.draw_seconds
+            self.generations_per_frame = float(max(1, int(spare / step_seconds))) if step_seconds > 0 else 1.0
+            self.generations_per_second = max(1, round(self.generations_per_frame * drawn_fps))
+        else:
+            self.generations_per_frame = generations_per_second / drawn_fps
+            self.generations_per_second = generations_per_second
+        return self.generations_per_second
+
+    def should_draw(self):
+        """Advance the frame counter, True if this frame should be drawn"""
+        self.frame += 1
+        return self.frame % self.draw_every == 0
+
+    def frame_done(self, generation, drawn):
+        """Update the measured display FPS and generations/second"""
+        if drawn:
+            self.draws += 1
+        now = time.perf_counter()
+        start, draws, start_generation = self.window_start
+        if start_generation is None or generation < start_generation:
+            # First frame, or the generation counter was reset
+            self.window_start = (now, self.draws, generation)
+        elif now - start >= RATE_WINDOW:
+            self.display_fps = (self.draws - draws) / (now - start)
+            self.real_generations_per_second = (generation - start_generation) / (now - start)
+            self.window_start = (now, self.draws, generation)
+
+    def status_lines(self):
+        """Scheduler decisions for the help box"""
+        draw = "every frame" if self.draw_every == 1 else f"1 of {self.draw_every} frames"
+        return [
+            f"Display: {self.display_fps:.0f}/{self.target_fps} fps",
+            f"Real: {self.real_generations_per_second:.0f} gen/s",
+            f"Gen/frame: {self.generations_per_frame:.1f}",
+            f"Draw: {draw}",
+        ]
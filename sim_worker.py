@@ -0,0 +1,140 @@
+import time
+import threading
+from contextlib import contextmanager
+from recorder import Recorder
+
+# Background simulation worker.
+# A daemon thread steps the Simulator independently of the render loop (the
+# numpy stepping releases the GIL for most of its work). Every finished
+# generation is published by swapping a reference: the next generation is
+# always computed into a fresh back buffer, so the published front buffer is
+# never written by the worker and the UI can draw it without copying.
+# The UI must change the simulator (cells, rules, size) inside edit(), which
+# holds the stepping lock and republishes the grid afterwards.
+# While recording, every generation the worker steps is queued to a Recorder.
+
+MAX_LAG = 0.25  # Seconds behind schedule before the pacing stops trying to catch up
+SMOOTHING = 0.1  # Weight of the newest generation in step_seconds
+
+class SimulationWorker:
+    """Steps a Simulator on a background thread at a target rate"""
+
+    def __init__(self, sim, generations_per_second=10):
+        self.sim = sim
+        self.generations_per_second = generations_per_second
+        self.lock = threading.RLock()  # Reentrant, so the recording controls can be used inside edit()
+        self.wake = threading.Event()
+        self.running = False
+        self.stopped = False
+        self.edits_waiting = 0
+        self.step_seconds = 0.0  # Moving average of the time per generation
+        self.busy_seconds = 0.0  # Total time spent stepping, read by the frame profiler
+        self.recorder = None
+        self.front = (sim.grid, sim.generation)
+        self.thread = threading.Thread(target=self.loop, name="simulation", daemon=True)
+        self.thread.start()
+
+    def latest(self):
+        """Latest complete generation as (grid, generation number), do not modify the grid"""
+        return self.front
+
+    def settled(self):
+        """latest() after a generation still being stepped was published (the worker is paused or waits)"""
+        with self.lock:
+            return self.front
+
+    def publish(self):
+        self.front = (self.sim.grid, self.sim.generation)
+
+    @contextmanager
+    def edit(self):
+        """Hold the stepping lock while the simulator is changed, then publish its grid"""
+        self.edits_waiting += 1
+        with self.lock:
+            self.edits_waiting -= 1
+            yield self.sim
+            self.publish()
+
+    def set_running(self, running):
+        if running != self.running:
+            self.running = running
+            self.wake.set()
+
+    def set_speed(self, generations_per_second):
+        """Change the target rate, the max speed mode gets its rate from the FrameScheduler"""
+        generations_per_second = max(1, generations_per_second)
+        if generations_per_second != self.generations_per_second:
+            self.generations_per_second = generations_per_second
+            self.wake.set()
+
+    def loop(self):
+        next_time = time.perf_counter()
+        while not self.stopped:
+            if not self.running:
+                self.wake.wait()
+                self.wake.clear()
+                next_time = time.perf_counter()
+                continue
+            if self.edits_waiting:
+                # Let the UI take the lock first
+                time.sleep(0.001)
+                continue
+
+            with self.lock:
+                if not self.running:
+                    # Paused while waiting for the lock, nothing is stepped after settled()
+                    continue
+                start = time.perf_counter()
+                self.sim.update_grid()
+                self.publish()
+                elapsed = time.perf_counter() - start
+                self.busy_seconds += elapsed
+                if self.recorder is not None:
+                    self.record()
+            if self.step_seconds == 0:
+                self.step_seconds = elapsed
+            else:
+                self.step_seconds += SMOOTHING * (elapsed - self.step_seconds)
+
+            next_time += 1 / self.generations_per_second
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                # Woken early when the speed or the running state changes
+                if self.wake.wait(delay):
+                    self.wake.clear()
+                    next_time = time.perf_counter()
+            elif delay < -MAX_LAG:
+                next_time = time.perf_counter()
+
+    def start_recording(self, path):
+        """Record every generation from now on into a .golrec file"""
+        with self.lock:
+            self.close_recorder()
+            self.recorder = Recorder(path, self.sim.grid.shape, self.sim.grid.dtype)
+            self.recorder.write(self.sim.grid, self.sim.generation)
+
+    def stop_recording(self):
+        with self.lock:
+            self.close_recorder()
+
+    def close_recorder(self):
+        if self.recorder is not None:
+            recorder, self.recorder = self.recorder, None
+            recorder.close()
+            print(f"[INFO] Recording saved to {recorder.path}")
+
+    def record(self):
+        grid = self.sim.grid
+        if grid.shape != self.recorder.shape or grid.dtype != self.recorder.dtype:
+            # A recording has one grid size and age resolution
+            print("[INFO] Grid size or age resolution changed, recording stopped")
+            self.close_recorder()
+        else:
+            self.recorder.write(grid, self.sim.generation)
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+        self.thread.join(timeout=1)
+        with self.lock:
+            self.close_recorder()
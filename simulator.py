@@ -0,0 +1,299 @@
+import time
+import numpy as np
+from engine import age_dtype, step_grid, step_grid_age
+from active_region import ActiveRegionStepper
+from cycles import CycleDetector, state_digest
+
+# Simulation core: rule state, grid and stepping, importable without pygame.
+# gol.py drives one Simulator instance interactively, headless.py runs it from the command line.
+
+RULE_PRESETS = [
+    (set([3]), set([2, 3])),          # 0: Conway's Life
+    (set([0, 8]), set([2, 3, 5, 6, 7])),   # 1:
+    (set([3, 5,6,7,8]), set([5,6,7,8])),      # 2: B35678/S5678 Diamoeba
+    (set([0, 7]), set([0, 2, 3])),   # 3:
+    (set([0]), set([0, 2, 4, 6])),# B0 S0246
+    (set([1, 2, 5]), set([2, 4, 5])),# 5:
+    (set([2, 4]), set([3, 4, 5])),   # 6:
+    #(set([3, 6, 8]), set([2, 3, 4])),# 7
+    (set([0,5,6]), set([0, 8])),
+    (set([1]), set([0,1,2,3,4,5,6,7,8])),# 8 fractal growth
+    (set([1,2,4,8]), set([0,2,7])),# 9:
+]
+#B2467 S45678
+AGE_RULE_PRESETS = [
+    # 0:
+    (set([3]), set([1, 2]), set([1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15]), set([1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 13, 14, 15])),
+    
+    # 1:
+    (set([0, 8]), set([2, 3, 5, 6, 7]), set([1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15]), set([1, 2, 4, 5, 6, 7, 8, 9, 11, 12, 13, 14, 15])),
+    
+    # 2:
+    (set([3, 6]), set([1, 2]), set([1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15]), set([1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15])),
+    
+    # 3:
+    (set([0, 7]), set([0, 2, 3]), set([1, 2, 3, 4, 5, 6, 8, 9, 10, 12, 13, 14, 15]), set([2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15])),
+    
+    # 4:
+    (set([0]), set([0, 2, 4, 6]), set([1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 13, 14, 15]), set([1, 2, 3, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14])),
+    
+    # 5:
+    (set([1, 2, 5]), set([2, 4, 5]), set([1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15]), set([1, 2, 3, 4, 5, 7, 8, 9, 10, 12, 13, 14, 15])),
+    
+    # 6:
+    (set([2, 4]), set([3, 4, 5]), set([1, 2, 3, 4, 5, 6, 8, 9, 11, 12, 13, 14, 15]), set([1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12, 13, 15])),
+    
+    # 7:
+    (set([0, 5, 6]), set([0, 8]), set([1, 2, 3, 4, 5, 6, 7, 9, 10, 11, 12, 14, 15]), set([2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14])),
+    
+    # 8: gameboy shrinking window
+    (set([0,1,2,3,7,8]), set([0,1,2,3,4,5]), set([1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]), set([1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15])),
+    
+    # 9:Droplets preset
+    (set([1]), set([0,2,7]), set([1, 4, 6, 7, 8, 9, 11, 13, 14, 15]), set([2, 3, 4, 5, 6, 7, 8, 11, 12, 14])),
+]
+
+#Droplets
+#Randomized rules: BIRTH=[1], SURVIVE=[1, 3, 8]
+#Randomized age rules: BIRTH_AGE=[1, 4, 6, 7, 8, 9, 11, 13, 14, 15], SURVIVE_AGE=[2, 3, 4, 5, 6, 7, 8, 11, 12, 14]
+
+#Randomized rules: BIRTH=[0, 1, 2, 7, 8], SURVIVE=[0, 6]
+#Randomized age rules: BIRTH_AGE=[1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15], SURVIVE_AGE=[1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+
+DEFAULT_PRESET = 6
+
+# advance_to jumps plain-rule runs ahead with HashLife when at least this many
+# generations (plus age_limit) are left and the first HASHLIFE_WARMUP stepped
+# generations found no cycle. Jumping may lose the stepping time of
+# HASHLIFE_ALLOWANCE generations before it has to pay off.
+HASHLIFE_MIN_GENERATIONS = 1 << 14
+HASHLIFE_WARMUP = 256
+HASHLIFE_ALLOWANCE = HASHLIFE_MIN_GENERATIONS // 2
+
+def parse_rule(rule):
+    """Parse a rule string like "B3/S23" into (birth, survive) sets"""
+    text = rule.strip().upper().replace("/", "")
+    if not text.startswith("B") or "S" not in text:
+        raise ValueError(f"Rule must look like B3/S23, got {rule!r}")
+    birth_text, survive_text = text[1:].split("S", 1)
+    digits = birth_text + survive_text
+    if digits and not digits.isdigit():
+        raise ValueError(f"Rule must look like B3/S23, got {rule!r}")
+    birth, survive = set(map(int, birth_text)), set(map(int, survive_text))
+    if any(n > 8 for n in birth | survive):
+        raise ValueError(f"Neighbor counts must be 0-8, got {rule!r}")
+    return birth, survive
+
+def format_rule(birth, survive):
+    """Format (birth, survive) sets as a rule string like B3/S23"""
+    return "B" + "".join(map(str, sorted(birth))) + "/S" + "".join(map(str, sorted(survive)))
+
+class Simulator:
+    """Grid and rule state of the automaton, stepped like the hardware but without any display"""
+
+    def __init__(self, grid_size_x=64, grid_size_y=48, age_resolution=4, age_influence=False):
+        self.birth, self.survive = map(set, RULE_PRESETS[DEFAULT_PRESET])
+        self.birth_age = set()
+        self.survive_age = set()
+        self.age_influence = age_influence
+        # Set when the grid is replaced or edited in place (mark_edited), the next step starts a new cycle search
+        self.edited = True
+        self.grid = np.zeros((grid_size_y, grid_size_x), dtype=age_dtype(age_resolution))
+        self.set_age_resolution(age_resolution)
+        self.generation = 0
+        # Only tiles whose neighborhood changed in the last generation are recomputed. A stepper
+        # may return None from step() and keep the generation in its own form (BitBoardStepper),
+        # then it gets None as the next grid and grid reads it back through materialize()
+        self.stepper = ActiveRegionStepper()
+        # Finds the period of the run, periodic generations are then answered without stepping
+        self.cycles = CycleDetector()
+        # Prebuilt glyphs for initialize_grid_with_text, see load_glyph_atlas
+        self.glyph_atlas = None
+        # Long plain-rule advance_to calls jump with HashLife, None disables it
+        self.hashlife_min_generations = HASHLIFE_MIN_GENERATIONS
+
+    @property
+    def grid(self):
+        """Current generation, read back from the stepper if it keeps the grid in its own form"""
+        if self.current_grid is None:
+            self.current_grid = self.stepper.materialize()
+        return self.current_grid
+
+    @grid.setter
+    def grid(self, grid):
+        self.current_grid = grid
+        self.edited = True
+
+    def mark_edited(self):
+        """Report cells changed in place (e.g. drawn in the app), replacing grid reports itself"""
+        self.edited = True
+
+    @property
+    def grid_size_x(self):
+        return self.grid.shape[1]
+
+    @property
+    def grid_size_y(self):
+        return self.grid.shape[0]
+
+    def set_age_resolution(self, bits):
+        """Set the number of age bits, updates age_limit and converts the grid to the matching dtype"""
+        self.age_resolution = bits
+        self.age_limit = (2 ** bits) - 1
+        self.grid = np.minimum(self.grid, self.age_limit).astype(age_dtype(bits))
+
+    def resize(self, grid_size_x, grid_size_y):
+        """Change the grid size, keeping the cells that still fit"""
+        old_grid = self.grid
+        self.grid = np.zeros((grid_size_y, grid_size_x), dtype=old_grid.dtype)
+        copy_h = min(old_grid.shape[0], grid_size_y)
+        copy_w = min(old_grid.shape[1], grid_size_x)
+        self.grid[:copy_h, :copy_w] = old_grid[:copy_h, :copy_w]
+
+    def apply_preset(self, preset):
+        """Load a rule preset, from AGE_RULE_PRESETS when age influence is enabled"""
+        if self.age_influence:
+            self.birth, self.survive, self.birth_age, self.survive_age = map(set, AGE_RULE_PRESETS[preset])
+        else:
+            self.birth, self.survive = map(set, RULE_PRESETS[preset])
+            # Reset age rules to full range when switching rule presets
+            self.birth_age = set(range(1, 16))
+            self.survive_age = set(range(1, 16))
+
+    def rule_signature(self):
+        return (frozenset(self.birth), frozenset(self.survive), frozenset(self.birth_age),
+                frozenset(self.survive_age), self.age_limit, self.age_influence)
+
+    def step_once(self, grid):
+        """Next generation of any grid under the current rules"""
+        if self.age_influence:
+            return step_grid_age(grid, self.birth, self.survive, self.birth_age, self.survive_age, self.age_limit)
+        return step_grid(grid, self.birth, self.survive, self.age_limit)
+
+    def update_grid(self):
+        """Advance the grid by one generation"""
+        self.step()
+        return self.grid
+
+    def step(self):
+        """Advance one generation without reading the grid back, steppers may keep it packed until grid is read"""
+        # Edits and rule changes start a new cycle search, ages only feed back into the rule with age influence
+        liveness_only = not self.age_influence
+        if not self.cycles.check(self.rule_signature(), self.take_edit()):
+            self.observe(liveness_only)
+
+        if self.cycles.cached():
+            self.current_grid = self.cycles.extrapolate(self.generation + 1, self.step_once, self.age_limit)
+        else:
+            # Age-based rule counts neighbors if their age is in birth_age and survive_age,
+            # default logic counts all cells with value >= 1
+            self.current_grid = self.stepper.step(self.current_grid, self.birth, self.survive, self.age_limit,
+                                                  self.birth_age, self.survive_age, self.age_influence)
+        self.generation += 1
+        self.observe(liveness_only)
+
+    def take_edit(self):
+        """True once after the grid was edited, steppers that keep state between generations are reset"""
+        if not self.edited:
+            return False
+        self.edited = False
+        if hasattr(self.stepper, "reset"):
+            self.stepper.reset()
+        return True
+
+    def observe(self, liveness_only):
+        """Add the current generation to the cycle search"""
+        if self.cycles.period is not None:
+            return
+        # Steppers that hash the grid while stepping or keep it packed answer from their own state
+        digest = getattr(self.stepper, "state_digest", state_digest)(self.current_grid, liveness_only)
+        if self.cycles.record(digest, self.generation):
+            self.cycles.reference = (self.grid.copy(), self.generation)
+
+    def advance_to(self, generation):
+        """Advance to the given generation, jumping straight there once the run is periodic"""
+        if generation < self.generation:
+            raise ValueError(f"Cannot go back from generation {self.generation} to {generation}")
+        hashlife = self.hashlife_min_generations is not None and not self.age_influence
+        stepped = 0
+        start = time.perf_counter()
+        while self.generation < generation:
+            if (self.cycles.period is not None and not self.edited
+                    and self.cycles.check(self.rule_signature())):
+                self.current_grid = self.cycles.extrapolate(generation, self.step_once, self.age_limit)
+                self.generation = generation
+                break
+            if (hashlife and stepped >= HASHLIFE_WARMUP
+                    and generation - self.generation - self.age_limit >= self.hashlife_min_generations):
+                # Imported here, HashLife is only needed for long runs
+                from hashlife import jump_ahead
+                step_seconds = (time.perf_counter() - start) / stepped
+                self.grid, advanced = jump_ahead(self.grid, self.birth, self.survive,
+                                                 generation - self.generation, self.age_limit, step_seconds,
+                                                 HASHLIFE_ALLOWANCE)
+                self.generation += advanced
+                # One try per call, a run that gave up on jumping would only give up again
+                hashlife = False
+                continue
+            self.step()
+            stepped += 1
+        return self.grid
+
+    def run(self, generations):
+        """Advance the grid by the given number of generations"""
+        return self.advance_to(self.generation + generations)
+
+    def initialize_grid_with_text(self, text, font_size=12, font_name=None, bold=False):
+        """Reset the grid to the given text, centered"""
+        atlas = self.glyph_atlas
+        if atlas is not None and atlas.matches(font_name, bold) and atlas.covers(text, font_size):
+            pixel_array = atlas.pixels(text, font_size)
+        else:
+            # Imported here so the simulator itself does not need PIL
+            from convert_char_to_pixels import char_to_pixels
+            pixel_array = char_to_pixels(text, fontsize=font_size, font_name=font_name, bold=bold)
+
+        #pixel_array = np.where(pixel_array != 0, 1, 0) # map all nonzero pixels to 1
+        return self.seed_grid(pixel_array, "Text")
+
+    def initialize_grid_with_image(self, path, fit=False):
+        """Reset the grid to an image, centered, its gray levels become ages (scaled down to the grid if fit)"""
+        from convert_char_to_pixels import convert_image
+        ages = convert_image(path, (self.grid_size_x, self.grid_size_y) if fit else None)
+        return self.seed_grid(np.minimum(ages, self.age_limit), "Image")
+
+    def seed_grid(self, pixel_array, name):
+        """Reset the grid to pixel_array (ages), centered"""
+        grid = np.zeros_like(self.grid)
+        h, w = pixel_array.shape
+        if h > self.grid_size_y or w > self.grid_size_x:
+            raise ValueError(f"{name} too large to fit in {self.grid_size_x}x{self.grid_size_y} grid (got {w}x{h})")
+        start_y = (self.grid_size_y - h) // 2
+        start_x = (self.grid_size_x - w) // 2
+        grid[start_y:start_y + h, start_x:start_x + w] = pixel_array
+        self.grid = grid
+        self.generation = 0
+        return grid
+
+    def load_glyph_atlas(self, base):
+        """Use the glyph atlas <base>.npy/.json for text of its font and sizes (no PIL needed)"""
+        from glyph_atlas import GlyphAtlas
+        self.glyph_atlas = GlyphAtlas(base)
+        return self.glyph_atlas
+
+    def load_pattern(self, path, offset=None):
+        """Reset the grid to a .rle or .cells pattern (centered unless an (x, y) offset is given)"""
+        # Imported here, patterns.py uses the rule parser of this module
+        from patterns import load_pattern
+        rule = load_pattern(path, self.grid, offset)
+        self.mark_edited()
+        # An RLE header rule replaces the birth/survive rule
+        if rule is not None:
+            self.birth, self.survive = rule
+        self.generation = 0
+        return self.grid
+
+    def save_pattern(self, path):
+        """Write the live cells as .cells or (any other extension) .rle with the birth/survive rule"""
+        from patterns import save_pattern
+        save_pattern(path, self.grid, self.birth, self.survive)
@@ -0,0 +1,216 @@
+import argparse
+import csv
+import numpy as np
+from engine import window_sum
+from simulator import RULE_PRESETS, parse_rule, format_rule
+
+# Batched rule-space sweep.
+# Many grids are stepped at once as a 3D array (one layer per B/S rule, all
+# starting from the same seed). Each layer is classified as soon as possible
+# and then dropped from the batch:
+#   dies out    - no live cells left
+#   explodes    - live cell density above EXPLODE_DENSITY
+#   stabilizes  - liveness repeats with period 1 (still life)
+#   oscillates  - liveness repeats with a period up to MAX_PERIOD
+#   long period - liveness repeats with a longer period, found with Brent's
+#                 method: the state at the last power-of-two generation is kept
+#                 and compared, so the transient is an upper bound
+#   chaotic     - none of the above within the generation budget
+# Only liveness matters for plain B/S rules, so ages are not simulated.
+# The batch size follows from a memory budget: every layer holds MAX_PERIOD + 1
+# packed states and a few byte planes while it is stepped.
+
+EXPLODE_DENSITY = 0.5
+MAX_PERIOD = 32
+BATCH_SIZE = 1024          # Most layers per batch, for small grids
+SWEEP_MEMORY = 256 * 1024**2  # Bytes of batch state
+WORK_BYTES_PER_CELL = 8    # Byte planes per cell while a layer is stepped (counts, lookups, next state)
+RULE_SPACE = 1 << 18  # 9 birth bits + 9 survive bits
+
+# Ranking order, the most interesting behavior for design-space exploration first
+CLASSES = ["chaotic", "long period", "oscillates", "stabilizes", "explodes", "dies out"]
+
+def rule_code(birth, survive):
+    """Encode a B/S rule as an 18 bit integer (bits 0-8 birth, bits 9-17 survive)"""
+    return sum(1 << n for n in birth) | sum(1 << (n + 9) for n in survive)
+
+def rule_from_code(code):
+    """Decode an 18 bit rule integer into (birth, survive) sets"""
+    return {n for n in range(9) if code >> n & 1}, {n for n in range(9) if code >> (n + 9) & 1}
+
+def batch_size_for(shape, max_period=MAX_PERIOD, memory=SWEEP_MEMORY):
+    """Layers per batch whose history and working planes fit into memory bytes, at most BATCH_SIZE"""
+    area = shape[0] * shape[1]
+    per_layer = (max_period + 1) * -(-area // 64) * 8 + WORK_BYTES_PER_CELL * area
+    return max(1, min(BATCH_SIZE, memory // per_layer))
+
+def classify_batch(codes, seed_alive, generations, max_period=MAX_PERIOD):
+    """Step one layer per rule code from the same seed and classify every layer"""
+    codes = np.asarray(codes, dtype=np.int64)
+    n = len(codes)
+    area = seed_alive.size
+
+    # Per-layer lookup tables over 8-neighbor counts 0-8
+    counts_range = np.arange(9)
+    birth_table = (codes[:, None] >> counts_range) & 1 == 1
+    survive_table = (codes[:, None] >> (counts_range + 9)) & 1 == 1
+
+    alive = np.repeat(seed_alive[None], n, axis=0)
+    layers = np.arange(n)  # Original index of every layer still in the batch
+
+    # Ring buffer of recent packed liveness states and their hashes for cycle detection
+    packed_size = np.packbits(seed_alive).size
+    words = -(-packed_size // 8)
+    history = np.zeros((max_period, n, words * 8), dtype=np.uint8)
+    hashes = np.zeros((max_period, n), dtype=np.uint64)
+    multipliers = np.random.default_rng(0).integers(1, 2**63, words, dtype=np.uint64) | np.uint64(1)
+
+    def pack(alive):
+        packed = np.zeros((len(alive), words * 8), dtype=np.uint8)
+        packed[:, :packed_size] = np.packbits(alive.reshape(len(alive), -1), axis=1)
+        return packed, (packed.view(np.uint64) * multipliers).sum(axis=1)
+
+    # The seed is generation 0
+    history[0], hashes[0] = pack(alive)
+    # Brent checkpoint for periods above max_period: the state at the last power-of-two generation
+    checkpoint, checkpoint_hash = history[0].copy(), hashes[0].copy()
+    checkpoint_generation = 0
+
+    result_class = np.full(n, "chaotic", dtype=object)
+    result_generation = np.full(n, generations)
+    result_period = np.zeros(n, dtype=int)
+    result_population = np.zeros(n, dtype=int)
+
+    for gen in range(1, generations + 1):
+        if len(layers) == 0:
+            break
+        index = layers[:, None, None]
+        counts = window_sum(alive.view(np.uint8)) - alive
+        alive = np.where(alive, survive_table[index, counts], birth_table[index, counts])
+
+        population = alive.reshape(len(layers), -1).sum(axis=1)
+        packed, digest = pack(alive)
+
+        # Compare against the last max_period generations, smallest period first
+        period = np.zeros(len(layers), dtype=int)
+        for p in range(1, min(gen, max_period) + 1):
+            slot = (gen - p) % max_period
+            match = (period == 0) & (hashes[slot, layers] == digest)
+            if match.any():
+                match[match] = (history[slot, layers[match]] == packed[match]).all(axis=1)
+                period[match] = p
+
+        # The first return to the checkpoint state is one full period later
+        match = (period == 0) & (checkpoint_hash[layers] == digest)
+        if match.any():
+            match[match] = (checkpoint[layers[match]] == packed[match]).all(axis=1)
+            period[match] = gen - checkpoint_generation
+        if gen & (gen - 1) == 0:
+            checkpoint[layers], checkpoint_hash[layers] = packed, digest
+            checkpoint_generation = gen
+
+        slot = gen % max_period
+        hashes[slot, layers] = digest
+        history[slot, layers] = packed
+
+        status = np.where(population == 0, "dies out",
+                 np.where(population > EXPLODE_DENSITY * area, "explodes",
+                 np.where(period == 1, "stabilizes",
+                 np.where(period > max_period, "long period",
+                 np.where(period > 1, "oscillates", "")))))
+        done = status != ""
+        period[population == 0] = 0
+        period[population > EXPLODE_DENSITY * area] = 0
+
+        finished = layers[done]
+        result_class[finished] = status[done]
+        result_generation[finished] = gen
+        result_period[finished] = period[done]
+        result_population[finished] = population[done]
+
+        keep = ~done
+        layers = layers[keep]
+        alive = alive[keep]
+
+    if len(layers):
+        result_population[layers] = alive.reshape(len(layers), -1).sum(axis=1)
+
+    return [
+        {
+            "rule": format_rule(*rule_from_code(int(code))),
+            "code": int(code),
+            "class": result_class[i],
+            "generation": int(result_generation[i]),
+            "period": int(result_period[i]),
+            "transient": int(result_generation[i] - result_period[i]) if result_period[i] else None,
+            "population": int(result_population[i]),
+        }
+        for i, code in enumerate(codes)
+    ]
+
+def rank(results):
+    """Sort results by class (most interesting first), then by how long they took to settle"""
+    return sorted(results, key=lambda r: (CLASSES.index(r["class"]), -r["generation"], -r["period"], r["code"]))
+
+def sweep(codes, seed_alive, generations=500, batch_size=None, max_period=MAX_PERIOD, log=True):
+    """Classify every rule code in batches (sized by batch_size_for by default), returns the ranked results"""
+    if batch_size is None:
+        batch_size = batch_size_for(seed_alive.shape, max_period)
+    results = []
+    for start in range(0, len(codes), batch_size):
+        batch = codes[start:start + batch_size]
+        results += classify_batch(batch, seed_alive, generations, max_period)
+        if log:
+            print(f"[INFO] Classified {min(start + batch_size, len(codes))}/{len(codes)} rules")
+    return rank(results)
+
+def format_table(results, top=None):
+    """Format ranked results as a text table"""
+    lines = [f"{'#':>5}  {'rule':<22} {'class':<11} {'gen':>6} {'period':>6} {'transient':>9} {'pop':>7}"]
+    for i, r in enumerate(results[:top] if top else results):
+        transient = "" if r["transient"] is None else r["transient"]
+        lines.append(f"{i + 1:>5}  {r['rule']:<22} {r['class']:<11} {r['generation']:>6} "
+                     f"{r['period'] or '':>6} {transient:>9} {r['population']:>7}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify many birth/survive rules at once")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--rules", nargs="+", help="rule strings like B3/S23")
+    source.add_argument("--all", action="store_true", help="sweep the full 2^18 B/S rule space")
+    source.add_argument("--random", type=int, help="sweep this many random rules")
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--height", type=int, default=48)
+    parser.add_argument("-n", "--generations", type=int, default=500)
+    parser.add_argument("--density", type=float, default=0.3, help="live cell density of the random seed")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help=f"rules stepped at once (default: as many as fit in {SWEEP_MEMORY // 1024**2} MB, "
+                             f"at most {BATCH_SIZE})")
+    parser.add_argument("--top", type=int, default=50, help="rows of the ranked table to print")
+    parser.add_argument("--csv", help="write all ranked results to this CSV file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    if args.all:
+        codes = np.arange(RULE_SPACE)
+    elif args.random:
+        codes = rng.choice(RULE_SPACE, size=min(args.random, RULE_SPACE), replace=False)
+    elif args.rules:
+        codes = np.array([rule_code(*parse_rule(rule)) for rule in args.rules])
+    else:
+        codes = np.array([rule_code(birth, survive) for birth, survive in RULE_PRESETS])
+
+    seed_alive = rng.random((args.height, args.width)) < args.density
+    results = sweep(codes, seed_alive, args.generations, args.batch_size)
+    print(format_table(results, args.top))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+import pygame
+
+# Size-bounded LRU caches for font objects and rendered text surfaces, so the
+# UI does not resolve system fonts or re-render unchanged labels every frame.
+
+MAX_FONTS = 64      # Enough for the 24 fonts of a font popup page plus the UI fonts
+MAX_SURFACES = 512  # Rendered labels (rule numbers, help text, font names, ...)
+
+class TextCache:
+    """LRU cache of pygame fonts keyed by (name, size) and text surfaces keyed by (font, text, color)"""
+
+    def __init__(self, max_fonts=MAX_FONTS, max_surfaces=MAX_SURFACES):
+        self.max_fonts = max_fonts
+        self.max_surfaces = max_surfaces
+        self.fonts = OrderedDict()
+        self.surfaces = OrderedDict()
+
+    def font(self, name, size):
+        """Return pygame.font.SysFont(name, size), loading it only on a cache miss"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+            if len(self.fonts) > self.max_fonts:
+                self.fonts.popitem(last=False)
+        else:
+            self.fonts.move_to_end(key)
+        return font
+
+    def render(self, font, text, color):
+        """Return font.render(text, True, color), rendering only on a cache miss"""
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_surfaces:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        """Drop all cached fonts and surfaces"""
+        self.fonts.clear()
+        self.surfaces.clear()